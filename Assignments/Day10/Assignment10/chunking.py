@@ -1,6 +1,13 @@
+import os
+import sys
 import streamlit as st
-from langchain_text_splitters import CharacterTextSplitter
-text_splitter = CharacterTextSplitter(chunk_size=500,chunk_overlap=50)
-docs = text_splitter.create_documents(["Gen Ai is leading area in IT sector , it replace humans but create new opportunity"])
+from langchain_core.documents import Document
+
+# shared resume helpers are the resume_rag package under Assignments/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from resume_rag.streaming_chunker import split_documents
+
+text = "Gen Ai is leading area in IT sector , it replace humans but create new opportunity"
+docs = list(split_documents([Document(page_content=text)], chunk_size=500, chunk_overlap=50))
 st.write(docs)
 print(docs)
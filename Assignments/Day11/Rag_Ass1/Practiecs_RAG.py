@@ -1,15 +1,26 @@
 import streamlit as st
 import os
-import tempfile
+import sys
+import time
 from datetime import datetime
 from dotenv import load_dotenv
-import time
 import chromadb
 from langchain_community.vectorstores import Chroma
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_openai import ChatOpenAI
+# shared resume helpers are the resume_rag package under Assignments/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from resume_rag.embedding_cache import EmbeddingCache, CachedEmbeddings, CACHE_DIR
+from context_builder import build_context
+from resume_catalog import ResumeCatalog
+from llm_fanout import fan_out
+from resilience import Resilient, CircuitOpenError
+from upload_pipeline import pipelined_upsert, chunk_ids
+from resume_ranking import aggregate_resumes, AGGREGATIONS
+from resume_rag.ingest_queue import IngestQueue, show_ingest_progress
+from resume_rag.pdf_parser import iter_pdf_pages
+from resume_rag.streaming_chunker import split_documents
+from resume_rag.response_cache import SemanticCache, normalize_query
 load_dotenv()
 CHROMA_API_KEY = os.getenv("CHROMA_API_KEY")
 if not CHROMA_API_KEY:
@@ -18,13 +29,41 @@ if not CHROMA_API_KEY:
 TENANT =os.getenv("TENANT_ID")
 DATABASE = "Chroma_db"
 COLLECTION_NAME = "resumes"
+CANDIDATE_TOKEN_BUDGET = 700
+# Resume catalog: one journal per Chroma collection, kept beside this app
+CATALOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resume_catalogs")
+
+# Uploads: records and request bytes per Chroma write
+UPLOAD_BATCH_SIZE = 100
+UPLOAD_MAX_BYTES = 4_000_000
+
+# Background ingestion workers per session
+INGEST_WORKERS = 4
+
+# Shortlisting: resumes to pick from, and chunks fetched before aggregating them
+# into resumes, 10 per resume at the slider's maximum
+MAX_CANDIDATES = 5
+SHORTLIST_FETCH_K = 50
+
+# Shortlisting: parallel LLM calls and per-candidate timeout in seconds
+LLM_CONCURRENCY = 3
+CANDIDATE_TIMEOUT = 60
+
+# Shortlist cache: job descriptions this similar, within this many seconds, reuse the answer
+RESPONSE_CACHE_THRESHOLD = 0.95
+RESPONSE_CACHE_TTL = 3600
 
 if "vector_store" not in st.session_state:
     st.session_state.vector_store = None
 
+if "ingest_queue" not in st.session_state:
+    st.session_state.ingest_queue = None
+
 def initialize_vector_store():
-    embeddings = HuggingFaceEmbeddings(
-        model_name="sentence-transformers/all-MiniLM-L6-v2"
+    embeddings = CachedEmbeddings(
+        HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2"),
+        model_name="all-MiniLM-L6-v2",
+        cache=EmbeddingCache(os.path.join(CACHE_DIR, "practice_rag"))
     )
 
     cloud_client = chromadb.CloudClient(
@@ -39,112 +78,190 @@ def initialize_vector_store():
         embedding_function=embeddings
     )
 
-def process_pdf(uploaded_file):
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-        tmp.write(uploaded_file.getvalue())
-        path = tmp.name
+@st.cache_resource(show_spinner=False)
+def load_catalog(collection_id):
+    # one catalog per collection and process, shared by every session
+    os.makedirs(CATALOG_DIR, exist_ok=True)
+    return ResumeCatalog(os.path.join(CATALOG_DIR, f"{collection_id}.jsonl"))
 
-    docs = PyPDFLoader(path).load()
-    os.remove(path)
+def sync_catalog(catalog, collection):
+    """Rebuild the catalog when it no longer accounts for every chunk, e.g. after another app instance wrote."""
+    if not catalog.exists() or catalog.chunk_count() != collection.count():
+        with st.spinner("Building resume catalog..."):
+            catalog.rebuild(collection)
 
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200
-    )
-    return splitter.split_documents(docs)
+def process_pdf(uploaded_file):
+    # UploadedFile is an in-memory buffer: parse it directly, no temp file,
+    # and chunk each page as it is extracted
+    pages = iter_pdf_pages(uploaded_file, uploaded_file.name)
+    return list(split_documents(pages, chunk_size=1000, chunk_overlap=200))
 
-def upload_resume(uploaded_file, vector_store):
+def upload_resume(uploaded_file, vector_store, catalog, guard=None, report=lambda stage: None, response_cache=None):
+    report("parsing")
     chunks = process_pdf(uploaded_file)
+    upload_date = datetime.now().isoformat()
+
+    texts = [chunk.page_content for chunk in chunks]
+    metadatas = [{
+        "filename": uploaded_file.name,
+        "upload_date": upload_date
+    } for _ in chunks]
+    ids = chunk_ids(uploaded_file.name, texts)
+
+    # embeds the next batch while the previous one is uploading
+    pipelined_upsert(
+        vector_store._collection, vector_store.embeddings, ids, texts, metadatas,
+        max_batch_size=UPLOAD_BATCH_SIZE,
+        max_payload_bytes=UPLOAD_MAX_BYTES,
+        guard=guard,
+        on_batch=lambda done, total: report(f"uploading batch {done}/{total}")
+    )
+    catalog.add(uploaded_file.name, upload_date, ids)
+    if response_cache is not None:
+        # a new resume can belong in any cached shortlist
+        response_cache.clear()
+    return len(ids)
 
-    for chunk in chunks:
-        chunk.metadata = {
-            "filename": uploaded_file.name,
-            "upload_date": datetime.now().isoformat()
-        }
-
-    vector_store.add_documents(chunks)
-    return True
-
-def list_resumes(vector_store):
-    try:
-        docs = vector_store.similarity_search(query="resume", k=50)
-        resumes = {}
-        for d in docs:
-            fname = d.metadata.get("filename")
-            if fname and fname not in resumes:
-                resumes[fname] = d.metadata.get("upload_date", "Unknown")
-        return resumes
-    except Exception as e:
-        st.error(f"Error listing resumes: {e}")
-        return {}
+def list_resumes(catalog):
+    return {fname: entry["upload_date"] for fname, entry in catalog.list().items()}
 
-def delete_resume(filename, vector_store):
+def delete_resumes(filenames, vector_store, catalog):
+    """Delete every chunk of the given resumes in one batched call; returns the chunk count removed."""
     try:
-        docs = vector_store.similarity_search(query=filename, k=100)
-        ids = [d.metadata.get("id") for d in docs if d.metadata.get("filename") == filename]
+        filenames = list(filenames)
+        # metadata filter, no embedding or vector query; also catches chunks the catalog missed
+        found = vector_store._collection.get(
+            where={"filename": {"$in": filenames}},
+            include=[]
+        )["ids"]
+        ids = list(dict.fromkeys(catalog.chunk_ids(filenames) + found))
         if ids:
             vector_store._collection.delete(ids=ids)
-            return True
-        return False
+        catalog.remove(filenames)
+        load_response_cache().invalidate(filenames)
+        return len(ids)
     except Exception as e:
         st.error(f"Delete error: {e}")
-        return False
-
-def safe_similarity_search(retriever, query, max_retries=3, wait=2):
-    for i in range(max_retries):
-        try:
-            return retriever.invoke(query)
-        except Exception as e:
-            if i < max_retries - 1:
-                time.sleep(wait)
-            else:
-                st.error(f"Error during similarity search: {e}")
-                return []
-
-def shortlist_resumes(job_desc, num_resumes, vector_store):
-  
-    MAX_K = min(num_resumes * 3, 20)
-    job_desc_short = job_desc[:1000]  
-
-    retriever = vector_store.as_retriever(search_kwargs={"k": MAX_K})
-    docs = safe_similarity_search(retriever, job_desc_short)
+        return 0
+
+@st.cache_resource(show_spinner=False)
+def load_guards():
+    # process-wide, so every session sees the same breaker state and histograms
+    return {
+        "vector": Resilient("Vector store", max_retries=2, base_delay=0.2, max_delay=2.0),
+        "llm": Resilient("LLM", max_retries=1, base_delay=0.5, max_delay=4.0)
+    }
+
+@st.cache_resource(show_spinner=False)
+def load_response_cache():
+    # shared by every session, so one HR user's shortlist serves the next
+    return SemanticCache(threshold=RESPONSE_CACHE_THRESHOLD, ttl=RESPONSE_CACHE_TTL)
+
+def safe_similarity_search(vector_store, query, k):
+    """(doc, relevance score) pairs, best first; [] when the vector store is unavailable."""
+    try:
+        return load_guards()["vector"].call(
+            vector_store.similarity_search_with_relevance_scores, query, k=k
+        )
+    except CircuitOpenError as e:
+        st.warning(f"⚠️ {e}")
+        return []
+    except Exception as e:
+        st.error(f"Error during similarity search: {e}")
+        return []
 
-    grouped = {}
-    for d in docs:
-        fname = d.metadata.get("filename", "Unknown")
-        grouped.setdefault(fname, []).append(d.page_content)
+def find_candidates(job_desc, num_resumes, vector_store, aggregation="sum_top_n"):
+    job_desc_short = job_desc[:1000]  
 
-    llm = ChatOpenAI(
-        model="gemma-2-9b-it",       
-        base_url="http://localhost:1234/v1",
-        api_key="lm-studio",
-        timeout=60,
-        max_retries=3
+    # over-fetch chunks, then rank whole resumes by their aggregated chunk scores
+    hits = safe_similarity_search(vector_store, job_desc_short, SHORTLIST_FETCH_K)
+    ranked = aggregate_resumes(
+        [(d.metadata.get("filename", "Unknown"), d.page_content, score) for d, score in hits],
+        method=aggregation
     )
 
-    results = []
-    for fname, chunks in list(grouped.items())[:num_resumes]:
+    # chunk vectors come from the embedding cache filled at upload time
+    query_vector = vector_store.embeddings.embed_query(job_desc_short)
+
+    candidates = []
+    for resume in ranked[:num_resumes]:
+        fname, chunks = resume["filename"], resume["chunks"]
+        resume_content, packing = build_context(
+            chunks,
+            CANDIDATE_TOKEN_BUDGET,
+            query_vector=query_vector,
+            vectors=vector_store.embeddings.embed_documents(chunks),
+            baseline_k=3,
+            separator="\n"
+        )
         prompt = f"""
 Job Description:
 {job_desc_short}
 
 Resume Content:
-{chr(10).join(chunks[:3])}
+{resume_content}
 
 Explain in 8–12 sentences why this candidate matches the job.
 """
-        try:
-            analysis = llm.invoke(prompt).content
-        except Exception as e:
-            analysis = f"LLM error: {e}"
-
-        results.append({
+        candidates.append({
             "filename": fname,
-            "analysis": analysis,
-            "chunks_found": len(chunks)
+            "score": resume["score"],
+            "prompt": prompt,
+            "chunks_found": len(chunks),
+            "tokens_saved": packing["tokens_saved"]
         })
 
-    return results
+    return candidates
+
+def analyze_candidates(candidates):
+    """Yield (rank_index, analysis) for each candidate as soon as its LLM call finishes."""
+    llm = ChatOpenAI(
+        model="gemma-2-9b-it",       
+        base_url="http://localhost:1234/v1",
+        api_key="lm-studio",
+        timeout=CANDIDATE_TIMEOUT,
+        max_retries=0  # retries are handled by the LLM guard
+    )
+    return fan_out(llm, [c["prompt"] for c in candidates], LLM_CONCURRENCY, guard=load_guards()["llm"])
+
+def shortlist_key(job_desc, vector_store):
+    return vector_store.embeddings.embed_query(normalize_query(job_desc))
+
+def cache_shortlist(key, params, results, generation):
+    # a failed analysis is worth retrying, not replaying
+    if results and not any(r["analysis"].startswith("LLM error:") for r in results):
+        load_response_cache().put(key, results, [r["filename"] for r in results], params, generation)
+
+def shortlist_resumes(job_desc, num_resumes, vector_store, aggregation="sum_top_n",
+                      on_ranked=lambda candidates: None, on_analysis=lambda i, analysis: None):
+    """
+    Ranked candidates with their analyses, from the shortlist cache when a similar job
+    description was answered. Returns (candidates, similarity); similarity is None on a
+    miss, where on_ranked and on_analysis report progress as the shortlist is computed.
+    """
+    key, params = shortlist_key(job_desc, vector_store), (num_resumes, aggregation)
+    generation = load_response_cache().generation
+    hit = load_response_cache().get(key, params)
+    if hit:
+        return hit
+    results = find_candidates(job_desc, num_resumes, vector_store, aggregation)
+    on_ranked(results)
+    for i, analysis in analyze_candidates(results):
+        results[i]["analysis"] = analysis
+        on_analysis(i, analysis)
+    cache_shortlist(key, params, results, generation)
+    return results, None
+
+def candidate_expander(i, r):
+    """Expander for the i-th candidate; returns the placeholder for its analysis."""
+    with st.expander(f"#{i} — {r['filename']}", expanded=i == 1):
+        slot = st.empty()
+        st.caption(
+            f"Score: {r['score']:.3f} · "
+            f"Relevant chunks: {r['chunks_found']} · "
+            f"prompt tokens saved: {r['tokens_saved']}"
+        )
+    return slot
 
 def main():
     st.set_page_config("AI Resume Shortlisting", "📄", "wide")
@@ -155,42 +272,84 @@ def main():
             st.session_state.vector_store = initialize_vector_store()
 
     vs = st.session_state.vector_store
+    catalog = load_catalog(str(vs._collection.id))
 
     page = st.sidebar.radio(
         "Action",
         ["Upload Resume", "List Resumes", "Delete Resume", "Shortlist Candidates"]
     )
 
+    with st.sidebar.expander("🩺 Backend health"):
+        for guard in load_guards().values():
+            st.write(f"**{guard.name}**")
+            st.json(guard.stats(), expanded=False)
+        st.write("**Shortlist cache**")
+        st.json(load_response_cache().stats(), expanded=False)
+
+    if st.session_state.ingest_queue is None:
+        guard, response_cache = load_guards()["vector"], load_response_cache()
+        st.session_state.ingest_queue = IngestQueue(
+            lambda f, report: upload_resume(f, vs, catalog, guard, report, response_cache),
+            workers=INGEST_WORKERS
+        )
+    queue = st.session_state.ingest_queue
+
     if page == "Upload Resume":
-        f = st.file_uploader("Upload PDF Resume", type="pdf")
-        if f and st.button("Upload"):
-            upload_resume(f, vs)
-            st.success("✅ Uploaded to Chroma Cloud")
+        files = st.file_uploader("Upload PDF Resumes", type="pdf", accept_multiple_files=True)
+        if files and st.button("Upload"):
+            for f in files:
+                queue.submit(f)
+            st.success(f"✅ Queued {len(files)} resume(s) for upload to Chroma Cloud")
+        if st.button("Clear finished"):
+            queue.clear_finished()
+        show_ingest_progress(queue)
 
     elif page == "List Resumes":
-        resumes = list_resumes(vs)
+        sync_catalog(catalog, vs._collection)
+        resumes = list_resumes(catalog)
         st.write(f"Total resumes found: {len(resumes)}")
         for k, v in resumes.items():
             st.write(f"📄 {k} — {v[:10]}")
 
     elif page == "Delete Resume":
-        resumes = list_resumes(vs)
+        sync_catalog(catalog, vs._collection)
+        resumes = list_resumes(catalog)
         if resumes:
-            sel = st.selectbox("Select resume", resumes.keys())
-            if st.button("Delete"):
-                delete_resume(sel, vs)
-                st.success("Deleted")
+            sel = st.multiselect("Select resumes", list(resumes.keys()))
+            if sel and st.button("Delete"):
+                removed = delete_resumes(sel, vs, catalog)
+                # shown after the rerun that refreshes the resume list
+                st.session_state.delete_notice = f"Deleted {len(sel)} resume(s), {removed} chunks removed"
                 st.rerun()
+        if "delete_notice" in st.session_state:
+            st.success(st.session_state.pop("delete_notice"))
 
     elif page == "Shortlist Candidates":
         jd = st.text_area("Job Description", height=200)
-        k = st.slider("Number of candidates", 1, 5, 3)
+        k = st.slider("Number of candidates", 1, MAX_CANDIDATES, 3)
+        aggregation = st.selectbox("Resume ranking", AGGREGATIONS, index=AGGREGATIONS.index("sum_top_n"))
         if st.button("Shortlist") and jd:
-            results = shortlist_resumes(jd, k, vs)
-            for i, r in enumerate(results, 1):
-                with st.expander(f"#{i} — {r['filename']}", expanded=i == 1):
-                    st.write(r["analysis"])
-                    st.caption(f"Relevant chunks: {r['chunks_found']}")
+            started = time.perf_counter()
+            slots = []
+
+            def show_ranked(candidates):
+                # expanders in rank order, each filled in as its analysis arrives
+                slots.extend(candidate_expander(i, r) for i, r in enumerate(candidates, 1))
+                for slot in slots:
+                    slot.info("⏳ Analyzing...")
+
+            candidates, similarity = shortlist_resumes(
+                jd, k, vs, aggregation,
+                on_ranked=show_ranked,
+                on_analysis=lambda i, analysis: slots[i].write(analysis)
+            )
+            if similarity is not None:
+                st.caption(
+                    f"⚡ Cached shortlist (similarity {similarity:.3f}, "
+                    f"{(time.perf_counter() - started) * 1000:.0f} ms)"
+                )
+                for i, r in enumerate(candidates, 1):
+                    candidate_expander(i, r).write(r["analysis"])
 
 if __name__ == "__main__":
     main()
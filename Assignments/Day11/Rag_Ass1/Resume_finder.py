@@ -1,24 +1,66 @@
 import os
+import sys
+import time
 import streamlit as st
 import chromadb
-from langchain_community.document_loaders import PyPDFDirectoryLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 from sentence_transformers import SentenceTransformer
 from openai import OpenAI
+# shared resume helpers are the resume_rag package under Assignments/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from ingest_pipeline import run_ingestion
+from index_manifest import load_manifest, save_manifest, plan_reindex, chunk_id
+from context_builder import build_context, estimate_tokens
+from resume_rag.pdf_parser import parse_pdfs
+from resume_rag.streaming_chunker import split_documents
+from resume_rag.embedding_cache import EmbeddingCache, CACHE_DIR
+from resume_rag.bm25_index import BM25Index, fuse_scores
+from resume_rag.quantized_index import QuantizedIndex, query_collection
+from resume_rag.numpy_store import NumpyVectorStore
 
 # ---------------- CONFIG ----------------
 RESUME_DIR = r"D:\IIT-GENAI-94391\Assignments\Day11\RESUME"
 CHROMA_PATH = "chroma_db"
 COLLECTION_NAME = "resumes"
 
+# Optional compact vector search: "int8" or "binary" codes scanned in memory,
+# the top QUANTIZED_RESCORE_N re-scored with exact float vectors; None turns it off
+QUANTIZATION = None
+QUANTIZED_RESCORE_N = 100
+
+# Vector backend: "chroma", or "numpy" for in-process exact search over a memory-mapped matrix.
+# Quantized search always uses "numpy": re-scoring reads a few float rows from the
+# on-disk matrix, so Chroma's float copy and HNSW graph would only add memory and disk
+VECTOR_BACKEND = "numpy" if QUANTIZATION else "chroma"
+NUMPY_STORE_PATH = os.path.join(CHROMA_PATH, "numpy_store")
+
+# each backend tracks what it has indexed, so switching re-indexes into the new one
+MANIFEST_PATH = os.path.join(NUMPY_STORE_PATH if VECTOR_BACKEND == "numpy" else CHROMA_PATH, "index_manifest.json")
+
+# Ingestion: chunks per encode call and embedding worker processes
+EMBED_BATCH_SIZE = 64
+EMBED_WORKERS = min(4, os.cpu_count() or 1)
+
+# PDF parsing: worker processes and per-file timeout in seconds
+PARSE_WORKERS = min(4, os.cpu_count() or 1)
+PARSE_TIMEOUT = 60
+
 # ✅ Embedding model (FREE, local)
-embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
 
-# LLM (LM Studio)
-client = OpenAI(
-    base_url="http://localhost:1234/v1",
-    api_key="lm-studio"
-)
+# Query embeddings kept in memory across reruns
+QUERY_CACHE_SIZE = 512
+
+# Retrieval: chunks fetched per query and the prompt context token budget.
+# The budget stays under the old top-5 join (~750 tokens of 600-character
+# chunks); twice as many candidates as fit leaves MMR room to diversify
+SEARCH_CANDIDATES = 10
+CONTEXT_TOKEN_BUDGET = 640
+
+# Hybrid search: BM25 weight in the fused score; "auto" mode answers
+# keyword queries up to this many terms from BM25 alone
+HYBRID_ALPHA = 0.4
+KEYWORD_QUERY_TERMS = 3
+SEARCH_MODES = ["hybrid", "vector", "lexical", "auto"]
 
 SYSTEM_PROMPT = """
 You are a resume analysis assistant.
@@ -27,71 +69,285 @@ and shortlist candidates against job requirements.
 Do not assume missing information.
 """
 
-# ---------------- CHROMA ----------------
-chroma_client = chromadb.PersistentClient(path=CHROMA_PATH)
-collection = chroma_client.get_or_create_collection(COLLECTION_NAME)
+# ---------------- SHARED RESOURCES ----------------
+# st.cache_resource keeps one instance per process, so Streamlit reruns
+# and other sessions reuse the loaded model and open clients
+
+@st.cache_resource(show_spinner=False)
+def load_embedding_model():
+    model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+    model.encode("warm up")  # first encode call initialises the runtime
+    return model
+
+@st.cache_resource(show_spinner=False)
+def load_collection():
+    if VECTOR_BACKEND == "numpy":
+        return NumpyVectorStore(NUMPY_STORE_PATH)
+    chroma_client = chromadb.PersistentClient(path=CHROMA_PATH)
+    collection = chroma_client.get_or_create_collection(COLLECTION_NAME)
+    collection.count()  # opens the persisted index
+    return collection
+
+@st.cache_resource(show_spinner=False)
+def load_embedding_cache():
+    # ✅ On-disk embedding cache in this app's own directory
+    return EmbeddingCache(os.path.join(CACHE_DIR, "resume_finder"))
+
+@st.cache_resource(show_spinner=False)
+def load_bm25_index():
+    index = BM25Index(os.path.join(CHROMA_PATH, "bm25_index.jsonl"))
+    if not len(index) and load_collection().count():
+        index.rebuild(load_collection())
+    return index
+
+@st.cache_resource(show_spinner=False)
+def load_quantized_index():
+    if QUANTIZATION is None:
+        return None
+    index = QuantizedIndex(os.path.join(NUMPY_STORE_PATH, f"vectors_{QUANTIZATION}"), mode=QUANTIZATION)
+    if not len(index) and load_collection().count():
+        index.rebuild(load_collection())
+    return index
+
+# LLM (LM Studio)
+@st.cache_resource(show_spinner=False)
+def load_llm_client():
+    return OpenAI(
+        base_url="http://localhost:1234/v1",
+        api_key="lm-studio"
+    )
+
+embedding_model = load_embedding_model()
+collection = load_collection()
+bm25_index = load_bm25_index()
+quantized_index = load_quantized_index()
+embedding_cache = load_embedding_cache()
+client = load_llm_client()
 
 # ---------------- FUNCTIONS ----------------
 def count_pdfs():
     return len([f for f in os.listdir(RESUME_DIR) if f.lower().endswith(".pdf")])
 
 def index_resumes():
-    loader = PyPDFDirectoryLoader(RESUME_DIR)
-    docs = loader.load()
+    manifest = load_manifest(MANIFEST_PATH)
+    if manifest is None:
+        # ✅ First incremental run: drop old position-based chunk_{i} ids
+        old_ids = collection.get(include=[])["ids"]
+        if old_ids:
+            collection.delete(ids=old_ids)
+        bm25_index.clear()
+        if quantized_index is not None:
+            quantized_index.clear()
 
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=600,
-        chunk_overlap=100
-    )
-
-    chunks = splitter.split_documents(docs)
-
-    documents, metadatas, ids, embeddings = [], [], [], []
+    changed, deleted, current = plan_reindex(RESUME_DIR, manifest)
 
-    for i, chunk in enumerate(chunks):
-        text = chunk.page_content
-        documents.append(text)
-        metadatas.append(chunk.metadata)
-        ids.append(f"chunk_{i}")
+    # ✅ Remove chunks of deleted files and the old chunks of changed files
+    stale_ids = [cid for name in deleted for cid in manifest[name]["chunk_ids"]]
+    stale_ids += [cid for name in changed for cid in current[name]["chunk_ids"]]
+    if stale_ids:
+        collection.delete(ids=stale_ids)
+        bm25_index.remove(stale_ids)
+        if quantized_index is not None:
+            quantized_index.remove(stale_ids)
 
-        # ✅ Create embedding
-        emb = embedding_model.encode(text).tolist()
-        embeddings.append(emb)
+    # ✅ BM25 must hold every chunk kept from earlier runs, including resumes
+    # indexed before it existed; otherwise rebuild it from the stored chunks
+    kept = sum(len(entry["chunk_ids"]) for name, entry in current.items() if name not in changed)
+    if len(bm25_index) != kept:
+        bm25_index.rebuild(collection)
 
-    if not documents:
+    if not current:
+        save_manifest(current, MANIFEST_PATH)
         st.error("No resumes found!")
         return
 
-    # ✅ Store with embeddings
-    collection.upsert(
-        documents=documents,
-        metadatas=metadatas,
-        ids=ids,
-        embeddings=embeddings
+    names_by_path = {current[name]["path"]: name for name in changed}
+    parse_errors = []
+
+    def iter_chunks():
+        # ✅ PDFs are parsed in worker processes and split as each one finishes
+        for path, docs in parse_pdfs(list(names_by_path), PARSE_WORKERS, PARSE_TIMEOUT, parse_errors):
+            name = names_by_path[path]
+            entry = current[name]
+            chunks = list(split_documents(docs, chunk_size=600, chunk_overlap=100))
+            entry["chunk_ids"] = [chunk_id(name, entry["hash"], i) for i in range(len(chunks))]
+            bm25_index.add_many(zip(entry["chunk_ids"], (chunk.page_content for chunk in chunks)))
+            for cid, chunk in zip(entry["chunk_ids"], chunks):
+                yield cid, chunk.page_content, chunk.metadata
+
+    # ✅ Embed in batches across worker processes, upserting as batches finish
+    stats = run_ingestion(
+        collection, iter_chunks(),
+        batch_size=EMBED_BATCH_SIZE,
+        workers=EMBED_WORKERS,
+        model=embedding_model,
+        model_name=EMBEDDING_MODEL_NAME,
+        cache=embedding_cache,
+        on_batch=quantized_index.add if quantized_index is not None else None
     )
 
-    st.success(f"Indexed {len(documents)} chunks from {count_pdfs()} PDFs")
+    # failed files stay out of the manifest so the next run retries them
+    for err in parse_errors:
+        current.pop(names_by_path[err["file"]])
+    save_manifest(current, MANIFEST_PATH)
+
+    st.success(
+        f"Indexed {stats['chunks']} chunks from {len(changed) - len(parse_errors)} new/changed PDFs, "
+        f"removed {len(deleted)} deleted PDFs ({len(current)} PDFs in index)"
+    )
+    if stats["chunks"]:
+        server, worker = stats["server_peak_mb"], stats["worker_peak_mb"]
+        st.caption(
+            f"⚡ {stats['chunks_per_sec']:.1f} chunks/sec in {stats['seconds']:.1f}s"
+            f" · {stats['cache_hits']} cached embeddings reused"
+            f" · app peak memory since start {f'{server:.0f} MB' if server else 'n/a'}"
+            + (f" · largest worker {worker:.0f} MB" if worker else "")
+        )
+    for err in parse_errors:
+        st.warning(f"Skipped {os.path.basename(err['file'])}: {err['error']}")
+
+def build_messages(context, query):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"Context:\n{context}\n\nTask:\n{query}"}
+    ]
 
 def ask_llm(context, query):
     response = client.chat.completions.create(
         model="gemma-2-9b-it",
-        messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": f"Context:\n{context}\n\nTask:\n{query}"}
-        ],
+        messages=build_messages(context, query),
         temperature=0.2,
         max_tokens=600
     )
     return response.choices[0].message.content
 
-def search_resumes(query):
-    query_embedding = embedding_model.encode(query).tolist()
+def stream_llm(context, query, metrics):
+    """Yield answer tokens as they arrive; fills metrics with ttft, tokens and tokens_per_sec."""
+    started = time.perf_counter()
+    first_token_at = None
+    parts = []
+    usage = None
 
-    results = collection.query(
-        query_embeddings=[query_embedding],
-        n_results=5
+    response = client.chat.completions.create(
+        model="gemma-2-9b-it",
+        messages=build_messages(context, query),
+        temperature=0.2,
+        max_tokens=600,
+        stream=True,
+        # the server's token count arrives in a final chunk without choices
+        stream_options={"include_usage": True}
     )
-    return "\n\n".join(results["documents"][0])
+    for chunk in response:
+        if getattr(chunk, "usage", None):
+            usage = chunk.usage
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+            parts.append(delta)
+            yield delta
+
+    # servers that ignore include_usage: estimate once over the whole answer
+    tokens = usage.completion_tokens if usage else estimate_tokens("".join(parts))
+    finished = time.perf_counter()
+    generation = finished - (first_token_at or finished)
+    metrics.update({
+        "ttft": (first_token_at or finished) - started,
+        "tokens": tokens,
+        "tokens_per_sec": tokens / generation if generation else 0.0,
+        "total": finished - started
+    })
+
+@st.cache_data(max_entries=QUERY_CACHE_SIZE, show_spinner=False)
+def embed_query(query):
+    # LRU-bounded: repeated HR queries skip the encoder
+    return embedding_model.encode(query).tolist()
+
+def fetch_documents(ids, include=("documents",)):
+    """{field: {chunk id: value}} for the requested fields of the given chunks."""
+    if not ids:
+        # Chroma rejects get(ids=[])
+        return {field: {} for field in include}
+    found = collection.get(ids=ids, include=list(include))
+    return {field: dict(zip(found["ids"], found[field])) for field in include}
+
+def search_resumes(query, mode="hybrid"):
+    """Returns (context, packing report, per-stage timings in ms)."""
+    query = " ".join(query.split())
+    timings = {}
+
+    def timed(stage, fn, *args, **kwargs):
+        started = time.perf_counter()
+        result = fn(*args, **kwargs)
+        timings[stage] = (time.perf_counter() - started) * 1000
+        return result
+
+    lexical = []
+    if mode != "vector":
+        lexical = timed("bm25_ms", bm25_index.search, query, SEARCH_CANDIDATES)
+    if mode == "auto":
+        mode = "lexical" if lexical and len(query.split()) <= KEYWORD_QUERY_TERMS else "hybrid"
+
+    if mode == "lexical":
+        # ✅ Exact keyword hits straight from BM25, the embedder is never touched
+        ids = [cid for cid, _ in lexical]
+        docs = timed("fetch_ms", fetch_documents, ids)["documents"]
+        context, packing = build_context([docs[c] for c in ids if c in docs], CONTEXT_TOKEN_BUDGET, baseline_k=5)
+        return context, packing, timings
+
+    query_embedding = timed("embed_ms", embed_query, query)
+    if quantized_index is not None:
+        results = timed(
+            "vector_ms", query_collection,
+            collection, quantized_index, query_embedding, SEARCH_CANDIDATES,
+            rescore_n=QUANTIZED_RESCORE_N,
+            include=["documents", "embeddings"]
+        )
+    else:
+        results = timed(
+            "vector_ms", collection.query,
+            query_embeddings=[query_embedding],
+            n_results=SEARCH_CANDIDATES,
+            include=["documents", "embeddings", "distances"]
+        )
+
+    if mode == "vector":
+        # ✅ Diverse, de-duplicated chunks packed to the token budget
+        context, packing = build_context(
+            results["documents"][0],
+            CONTEXT_TOKEN_BUDGET,
+            query_vector=query_embedding,
+            vectors=results["embeddings"][0],
+            baseline_k=5
+        )
+        return context, packing, timings
+
+    # ✅ Hybrid: fuse BM25 and vector scores, then MMR-pack starting from the fused scores
+    started = time.perf_counter()
+    docs = dict(zip(results["ids"][0], results["documents"][0]))
+    vectors = dict(zip(results["ids"][0], results["embeddings"][0]))
+    vector_hits = [(cid, -d) for cid, d in zip(results["ids"][0], results["distances"][0])]
+    fused = fuse_scores(lexical, vector_hits, HYBRID_ALPHA)[:SEARCH_CANDIDATES]
+    missing = [cid for cid, _ in fused if cid not in docs]
+    if missing:
+        # BM25-only hits: fetch their text and vectors for MMR
+        found = fetch_documents(missing, include=("documents", "embeddings"))
+        docs.update(found["documents"])
+        vectors.update(found["embeddings"])
+    fused = [(cid, score) for cid, score in fused if cid in docs]
+    timings["fusion_ms"] = (time.perf_counter() - started) * 1000
+
+    context, packing = build_context(
+        [docs[c] for c, _ in fused],
+        CONTEXT_TOKEN_BUDGET,
+        query_vector=query_embedding,
+        vectors=[vectors[c] for c, _ in fused],
+        relevance=[score for _, score in fused],
+        baseline_k=5
+    )
+    return context, packing, timings
 
 # ---------------- STREAMLIT UI ----------------
 st.set_page_config(page_title="HR Resume Finder (RAG)", layout="wide")
@@ -113,14 +369,36 @@ with col2:
 
 st.divider()
 
+if "llm_metrics" not in st.session_state:
+    st.session_state.llm_metrics = []
+
 query = st.text_input("🔍 Ask anything about resumes (summary, skills, shortlist):")
+search_mode = st.selectbox("Search mode", SEARCH_MODES)
+stream_answer = st.toggle("Stream answer", value=True)
 
 if st.button("Analyze"):
     if not query:
         st.warning("Enter a query")
     else:
-        context = search_resumes(query)
-        answer = ask_llm(context, query)
+        context, packing, timings = search_resumes(query, search_mode)
 
         st.subheader("📌 Result")
-        st.write(answer)
+        st.caption(
+            f"🧩 {packing['chunks_used']}/{packing['chunks_in']} chunks, "
+            f"{packing['tokens_used']} context tokens ({packing['tokens_saved']} saved) · "
+            + " · ".join(f"{stage} {ms:.1f}" for stage, ms in timings.items())
+        )
+        if stream_answer:
+            metrics = {}
+            st.write_stream(stream_llm(context, query, metrics))
+            st.session_state.llm_metrics.append(metrics)
+            st.caption(
+                f"⏱️ First token {metrics['ttft']:.2f}s · "
+                f"{metrics['tokens']} tokens at {metrics['tokens_per_sec']:.1f} tokens/sec"
+            )
+        else:
+            st.write(ask_llm(context, query))
+
+if st.session_state.llm_metrics:
+    with st.expander("📈 LLM latency this session"):
+        st.dataframe(st.session_state.llm_metrics)
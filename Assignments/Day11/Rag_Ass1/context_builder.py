@@ -0,0 +1,94 @@
+import numpy as np
+
+# overlaps shorter than this are treated as coincidence, not splitter overlap
+MIN_OVERLAP = 20
+MAX_OVERLAP = 400
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token for English text)."""
+    return (len(text) + 3) // 4
+
+
+def overlap_length(left, right, min_overlap=MIN_OVERLAP, max_overlap=MAX_OVERLAP):
+    """Length of the longest suffix of `left` that is also a prefix of `right`."""
+    for k in range(min(len(left), len(right), max_overlap), min_overlap - 1, -1):
+        if left.endswith(right[:k]):
+            return k
+    return 0
+
+
+def strip_overlap(text, selected):
+    """Remove spans of text that are already covered by the selected chunks."""
+    for other in selected:
+        if text in other:
+            return ""
+        head = overlap_length(other, text)
+        if head:
+            text = text[head:]
+        tail = overlap_length(text, other)
+        if tail:
+            text = text[:-tail]
+    return text.strip()
+
+
+def mmr_select(query_vector, vectors, k, lambda_mult=0.5, relevance=None):
+    """
+    Order up to k documents by maximal marginal relevance.
+
+    Each step picks the document most similar to the query after
+    penalising its similarity to documents already picked. `relevance`
+    replaces the query similarity, e.g. with fused hybrid scores in 0..1.
+    """
+    vectors = np.array(vectors, dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+    if relevance is None:
+        query = np.array(query_vector, dtype=np.float32)
+        query /= np.linalg.norm(query) + 1e-12
+        relevance = vectors @ query
+    relevance = np.asarray(relevance, dtype=np.float32)
+    redundancy = np.zeros(len(vectors), dtype=np.float32)
+    chosen = []
+    for _ in range(min(k, len(vectors))):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        scores[chosen] = -np.inf
+        best = int(np.argmax(scores))
+        chosen.append(best)
+        redundancy = np.maximum(redundancy, vectors @ vectors[best])
+    return chosen
+
+
+def build_context(texts, token_budget, query_vector=None, vectors=None, lambda_mult=0.5,
+                  baseline_k=None, count_tokens=estimate_tokens, separator="\n\n", relevance=None):
+    """
+    Pack retrieved chunks into a prompt context that fits token_budget.
+
+    Chunks are taken in MMR order when embeddings are given (otherwise in
+    rank order; `relevance` overrides the query similarity MMR starts from), overlapping spans are stripped and chunks that no longer
+    fit are skipped. Returns (context, report); the report compares the
+    packed context with naively joining the top baseline_k chunks.
+    """
+    order = list(range(len(texts)))
+    if query_vector is not None and vectors is not None and len(texts):
+        order = mmr_select(query_vector, vectors, len(texts), lambda_mult, relevance)
+
+    selected, used = [], 0
+    for i in order:
+        text = strip_overlap(texts[i], selected)
+        if not text:
+            continue
+        cost = count_tokens(text) + (count_tokens(separator) if selected else 0)
+        if used + cost > token_budget:
+            continue
+        selected.append(text)
+        used += cost
+
+    context = separator.join(selected)
+    baseline = count_tokens(separator.join(texts[:baseline_k or len(texts)]))
+    return context, {
+        "chunks_in": len(texts),
+        "chunks_used": len(selected),
+        "tokens_baseline": baseline,
+        "tokens_used": count_tokens(context),
+        "tokens_saved": max(0, baseline - count_tokens(context))
+    }
@@ -0,0 +1,82 @@
+import os
+import json
+import hashlib
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_hash(path):
+    """SHA-256 of a file's contents, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_id(name, content_hash, index):
+    """
+    Stable chunk id: the same file with the same content always yields the
+    same ids. The filename is part of the id, so identical copies of a PDF
+    under different names never share (and overwrite) each other's chunks.
+    """
+    return f"{name}:{content_hash[:16]}_{index}"
+
+
+def load_manifest(path):
+    """Load the manifest, or return None if indexing has never run."""
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path):
+    """Write the manifest atomically so a crash never leaves it half written."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def plan_reindex(resume_dir, manifest):
+    """
+    Compare the resume folder with the manifest.
+
+    Files whose size and mtime are unchanged keep their stored hash, so only
+    new or touched files are read. Returns (changed, deleted, current) where
+    changed lists the filenames to parse, deleted lists filenames that are
+    gone and current maps every PDF to its fresh manifest entry (chunk_ids of
+    changed files still hold the old ids until they are re-indexed).
+    """
+    manifest = manifest or {}
+    changed, current = [], {}
+
+    for name in sorted(os.listdir(resume_dir)):
+        if not name.lower().endswith(".pdf"):
+            continue
+        path = os.path.join(resume_dir, name)
+        stat = os.stat(path)
+        old = manifest.get(name)
+
+        if old and old["size"] == stat.st_size and old["mtime"] == stat.st_mtime:
+            current[name] = old
+            continue
+
+        content_hash = file_hash(path)
+        if old and old["hash"] == content_hash:
+            # touched but not modified: just refresh size/mtime
+            current[name] = dict(old, size=stat.st_size, mtime=stat.st_mtime)
+            continue
+
+        current[name] = {
+            "path": path,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "hash": content_hash,
+            "chunk_ids": old["chunk_ids"] if old else []
+        }
+        changed.append(name)
+
+    deleted = [name for name in manifest if name not in current]
+    return changed, deleted, current
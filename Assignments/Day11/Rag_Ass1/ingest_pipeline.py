@@ -0,0 +1,167 @@
+import os
+import time
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
+
+from resume_rag.embedding_cache import text_key
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+
+# runs with fewer chunks than this are encoded in-process: each worker
+# would load its own copy of the model before encoding anything
+MIN_POOL_CHUNKS = 512
+
+# model loaded once per worker process by _init_worker
+_worker_model = None
+
+
+def _init_worker(model_name, threads):
+    """Load the embedding model once inside each worker process."""
+    global _worker_model
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    # keep workers from fighting each other for the same cores
+    torch.set_num_threads(threads)
+    _worker_model = SentenceTransformer(model_name)
+
+
+def _encode_batch(texts):
+    """Encode one batch of chunk texts in a worker process; returns (vectors, worker peak MB)."""
+    return _worker_model.encode(texts, batch_size=len(texts)).tolist(), peak_memory_mb()
+
+
+def make_batches(chunks, batch_size):
+    """Group an iterable of (id, text, metadata) chunks into lists of at most batch_size."""
+    if batch_size < 1:
+        raise ValueError("Batch size must be at least 1")
+    batch = []
+    for chunk in chunks:
+        batch.append(chunk)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def peak_memory_mb():
+    """Peak resident memory of the calling process since it started, in MB, or None if unknown."""
+    if resource is None:
+        return None
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    unit = 1024 * 1024 if os.uname().sysname == "Darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unit
+
+
+def run_ingestion(collection, chunks, batch_size=64, workers=1,
+                  model=None, model_name=MODEL_NAME, cache=None, on_batch=None):
+    """
+    Embed (id, text, metadata) chunks in batches and upsert each batch as soon as it is ready.
+
+    `chunks` may be a generator: batches are formed lazily and at most two
+    batches per worker are in flight, so memory stays bounded. With
+    workers > 1 and at least MIN_POOL_CHUNKS chunks the batches are spread
+    over a spawned process pool, otherwise they are encoded in-process with
+    the already loaded model. If an EmbeddingCache is given, only texts
+    missing from it are encoded. on_batch(ids, vectors) is called after each
+    upsert, e.g. to feed a QuantizedIndex.
+    Returns a dict with chunks, cache_hits, seconds, chunks_per_sec,
+    server_peak_mb (this process, since it started) and worker_peak_mb
+    (the largest pool worker of this run, None when encoded in-process).
+    """
+    started = time.perf_counter()
+    total = 0
+    cache_hits = 0
+    worker_peaks = []
+
+    def lookup(batch):
+        texts = [text for _, text, _ in batch]
+        if cache is None:
+            return batch, [None] * len(texts), list(range(len(texts)))
+        keys = [text_key(model_name, t) for t in texts]
+        vectors = [cache.get(k) for k in keys]
+        return batch, vectors, [i for i, v in enumerate(vectors) if v is None]
+
+    def complete(batch, vectors, missing, fresh):
+        nonlocal total, cache_hits
+        for i, vector in zip(missing, fresh):
+            vectors[i] = vector
+            if cache is not None:
+                cache.put(text_key(model_name, batch[i][1]), vector)
+        ids, documents, metadatas = zip(*batch)
+        collection.upsert(
+            documents=list(documents),
+            metadatas=list(metadatas),
+            ids=list(ids),
+            embeddings=[list(map(float, v)) for v in vectors]
+        )
+        if on_batch is not None:
+            on_batch(list(ids), vectors)
+        total += len(batch)
+        cache_hits += len(batch) - len(missing)
+
+    def finish(job, result):
+        fresh, peak = result
+        complete(*job, fresh)
+        if peak is not None:
+            worker_peaks.append(peak)
+
+    if workers > 1:
+        # peek far enough to know whether the pool is worth starting
+        chunks = iter(chunks)
+        head = list(itertools.islice(chunks, MIN_POOL_CHUNKS))
+        if len(head) < MIN_POOL_CHUNKS:
+            workers = 1
+        chunks = itertools.chain(head, chunks)
+
+    if workers <= 1:
+        if model is None:
+            from sentence_transformers import SentenceTransformer
+            model = SentenceTransformer(model_name)
+        for batch in make_batches(chunks, batch_size):
+            batch, vectors, missing = lookup(batch)
+            fresh = model.encode([batch[i][1] for i in missing], batch_size=batch_size) if missing else []
+            complete(batch, vectors, missing, fresh)
+    else:
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        # spawn: forking a threaded Streamlit server with torch loaded can deadlock the child
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model_name, threads)
+        ) as pool:
+            in_flight = {}
+            for batch in make_batches(chunks, batch_size):
+                batch, vectors, missing = lookup(batch)
+                if not missing:
+                    complete(batch, vectors, missing, [])
+                    continue
+                future = pool.submit(_encode_batch, [batch[i][1] for i in missing])
+                in_flight[future] = (batch, vectors, missing)
+                if len(in_flight) >= 2 * workers:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        finish(in_flight.pop(future), future.result())
+            for future in as_completed(in_flight):
+                finish(in_flight[future], future.result())
+
+    if cache is not None:
+        cache.flush()
+
+    seconds = time.perf_counter() - started
+    return {
+        "chunks": total,
+        "cache_hits": cache_hits,
+        "seconds": seconds,
+        "chunks_per_sec": total / seconds if seconds else 0.0,
+        "server_peak_mb": peak_memory_mb(),
+        "worker_peak_mb": max(worker_peaks, default=None)
+    }
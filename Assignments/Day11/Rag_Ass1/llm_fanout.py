@@ -0,0 +1,89 @@
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def fan_out(llm, prompts, concurrency=4, guard=None):
+    """
+    Invoke the LLM on every prompt with at most `concurrency` calls in flight.
+
+    Yields (index, text) in completion order so callers can show each answer
+    as soon as it is ready; failed or timed-out calls yield "LLM error: ...".
+    Per-call timeouts come from the LLM client's own `timeout` setting. If a
+    resilience.Resilient guard is given, calls go through its retries and
+    circuit breaker.
+    """
+    def invoke(prompt):
+        if guard is None:
+            return llm.invoke(prompt)
+        return guard.call(llm.invoke, prompt)
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = {pool.submit(invoke, prompt): i for i, prompt in enumerate(prompts)}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result().content
+            except Exception as e:
+                yield futures[future], f"LLM error: {e}"
+
+
+def start_stub_server(delay=1.0):
+    """Local OpenAI-compatible chat endpoint that answers after `delay` seconds."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(delay)
+            body = json.dumps({
+                "id": "stub",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": "stub",
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "Stub analysis."},
+                    "finish_reason": "stop"
+                }],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 2, "total_tokens": 3}
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    from langchain_openai import ChatOpenAI
+
+    server = start_stub_server(delay=1.0)
+    llm = ChatOpenAI(
+        model="stub",
+        base_url=f"http://127.0.0.1:{server.server_port}/v1",
+        api_key="stub",
+        timeout=30
+    )
+    prompts = [f"Candidate {i}" for i in range(5)]
+
+    start = time.perf_counter()
+    for p in prompts:
+        llm.invoke(p)
+    sequential = time.perf_counter() - start
+    print(f"sequential:      {sequential:.2f}s")
+
+    for concurrency in (2, 5):
+        start = time.perf_counter()
+        list(fan_out(llm, prompts, concurrency))
+        elapsed = time.perf_counter() - start
+        print(f"concurrency={concurrency}:   {elapsed:.2f}s  ({sequential / elapsed:.1f}x speedup)")
+
+    server.shutdown()
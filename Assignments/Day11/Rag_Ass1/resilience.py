@@ -0,0 +1,176 @@
+import time
+import random
+import bisect
+import threading
+
+# latency histogram bucket upper bounds in milliseconds
+LATENCY_BUCKETS_MS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the backend while the circuit breaker is open."""
+
+
+class Histogram:
+    """Fixed-bucket latency histogram with a simple percentile estimate."""
+
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0
+
+    def record(self, value_ms):
+        self.counts[bisect.bisect_left(self.bounds, value_ms)] += 1
+        self.total += 1
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile (inf for the overflow bucket)."""
+        if not self.total:
+            return None
+        target = p / 100 * self.total
+        seen = 0
+        for bound, count in zip(self.bounds + [float("inf")], self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return float("inf")
+
+    def snapshot(self):
+        labels = [f"<={b}ms" for b in self.bounds] + [f">{self.bounds[-1]}ms"]
+        return dict(zip(labels, self.counts))
+
+
+class Resilient:
+    """
+    Retry with jittered exponential backoff behind a circuit breaker.
+
+    After `failure_threshold` consecutive failed attempts the circuit opens
+    and calls fail fast with CircuitOpenError for `reset_timeout` seconds;
+    then one trial call is let through and closes the circuit if it succeeds.
+    """
+
+    def __init__(self, name, max_retries=3, base_delay=0.2, max_delay=2.0,
+                 failure_threshold=5, reset_timeout=30, sleep=time.sleep):
+        self.name = name
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.sleep = sleep
+
+        self.lock = threading.Lock()
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trial_running = False
+
+        self.latency = Histogram()
+        self.calls = 0
+        self.errors = {}
+        self.rejected = 0
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def _admit(self):
+        with self.lock:
+            state = self.state
+            if state == "closed":
+                return
+            if state == "half-open" and not self.trial_running:
+                self.trial_running = True
+                return
+            self.rejected += 1
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+            raise CircuitOpenError(f"{self.name} unavailable, retrying in {retry_in:.0f}s")
+
+    def _record(self, started, error=None):
+        with self.lock:
+            self.latency.record((time.perf_counter() - started) * 1000)
+            self.calls += 1
+            self.trial_running = False
+            if error is None:
+                self.consecutive_failures = 0
+                self.opened_at = None
+                return
+            name = type(error).__name__
+            self.errors[name] = self.errors.get(name, 0) + 1
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+
+    def call(self, fn, *args, **kwargs):
+        """Call fn with retries; raises the last error, or CircuitOpenError while open."""
+        for attempt in range(self.max_retries + 1):
+            self._admit()
+            started = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                self._record(started, e)
+                if attempt == self.max_retries or self.state != "closed":
+                    raise
+                # full jitter: spreads retries out so clients don't stampede a recovering backend
+                self.sleep(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)))
+            else:
+                self._record(started)
+                return result
+
+    def stats(self):
+        return {
+            "state": self.state,
+            "calls": self.calls,
+            "errors": dict(self.errors),
+            "rejected": self.rejected,
+            "p50_ms": self.latency.percentile(50),
+            "p99_ms": self.latency.percentile(99),
+            "latency_ms": self.latency.snapshot()
+        }
+
+
+class FlakyBackend:
+    """Fault-injecting stand-in for a vector store or LLM endpoint."""
+
+    def __init__(self, failure_rate=0.0, latency=0.01, down=False):
+        self.failure_rate = failure_rate
+        self.latency = latency
+        self.down = down
+
+    def invoke(self, query):
+        time.sleep(self.latency)
+        if self.down or random.random() < self.failure_rate:
+            raise ConnectionError("injected fault")
+        return [f"result for {query}"]
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    backend = FlakyBackend(failure_rate=0.2)
+    guard = Resilient("flaky", max_retries=3, base_delay=0.01, failure_threshold=5, reset_timeout=0.5)
+
+    ok = sum(1 for i in range(100) if guard.call(backend.invoke, i))
+    print(f"20% faults: {ok}/100 calls succeeded after retries, stats={guard.stats()}")
+
+    backend.down = True
+    start = time.perf_counter()
+    outcomes = []
+    for i in range(50):
+        try:
+            guard.call(backend.invoke, i)
+            outcomes.append("ok")
+        except CircuitOpenError:
+            outcomes.append("fast-fail")
+        except ConnectionError:
+            outcomes.append("error")
+    elapsed = time.perf_counter() - start
+    print(f"outage: {outcomes.count('error')} errors, {outcomes.count('fast-fail')} fast failures "
+          f"in {elapsed:.2f}s, state={guard.state}")
+
+    backend.down = False
+    time.sleep(0.5)
+    print(f"recovered: {guard.call(backend.invoke, 'probe')}, state={guard.state}")
@@ -0,0 +1,105 @@
+import threading
+
+from resume_rag.journal import Journal
+
+
+class ResumeCatalog:
+    """
+    Local catalog of uploaded resumes: filename -> upload_date, chunk_ids, chunk_count.
+
+    Kept up to date on every upload and delete so listing resumes is a
+    dictionary read instead of a vector query. Changes are appended to a
+    JSON-lines journal, so each update costs one small write no matter how
+    many resumes are stored; the journal is compacted when loaded. Other
+    writers to the same collection are not seen, so callers compare
+    chunk_count() with the collection's count() and rebuild on a mismatch.
+    """
+
+    def __init__(self, path):
+        self.journal = Journal(path)
+        self.lock = threading.Lock()
+        self.entries = {}
+        for change in self.journal.replay():
+            self._apply(change, log=False)
+        if self.journal.lines > len(self.entries):
+            self._compact()
+
+    def exists(self):
+        return self.journal.exists()
+
+    def add(self, filename, upload_date, chunk_ids):
+        """Record a resume; re-uploading the same filename appends its new chunks."""
+        with self.lock:
+            self._apply({"op": "add", "filename": filename,
+                         "upload_date": upload_date, "chunk_ids": list(chunk_ids)})
+
+    def remove(self, filenames):
+        """Drop resumes from the catalog and return their entries."""
+        with self.lock:
+            removed = {f: self.entries[f] for f in filenames if f in self.entries}
+            if removed:
+                self._apply({"op": "remove", "filenames": list(removed)})
+            return removed
+
+    def list(self):
+        """
+        filename -> entry for every resume, without touching the vector store.
+        Returns a copy taken under the lock, so upload workers adding resumes
+        can't change it while the caller iterates.
+        """
+        with self.lock:
+            return {fname: dict(entry) for fname, entry in self.entries.items()}
+
+    def chunk_count(self):
+        """Chunks across all resumes, to compare with the collection's count()."""
+        with self.lock:
+            return sum(entry["chunk_count"] for entry in self.entries.values())
+
+    def chunk_ids(self, filenames):
+        """All chunk ids stored for the given resumes."""
+        with self.lock:
+            return [cid for f in filenames for cid in self.entries.get(f, {}).get("chunk_ids", [])]
+
+    def rebuild(self, collection, page_size=1000):
+        """Rebuild the catalog from chunk metadata, paging through the whole collection."""
+        entries = {}
+        offset = 0
+        while True:
+            page = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+            for chunk_id, meta in zip(page["ids"], page["metadatas"]):
+                fname = (meta or {}).get("filename")
+                if not fname:
+                    continue
+                entry = entries.setdefault(fname, {
+                    "upload_date": meta.get("upload_date", "Unknown"),
+                    "chunk_ids": [],
+                    "chunk_count": 0
+                })
+                entry["chunk_ids"].append(chunk_id)
+                entry["chunk_count"] += 1
+            if len(page["ids"]) < page_size:
+                break
+            offset += page_size
+
+        with self.lock:
+            self.entries = entries
+            self._compact()
+
+    def _apply(self, change, log=True):
+        if change["op"] == "add":
+            entry = self.entries.setdefault(change["filename"], {"chunk_ids": []})
+            entry["upload_date"] = change["upload_date"]
+            entry["chunk_ids"] = list(dict.fromkeys(entry["chunk_ids"] + change["chunk_ids"]))
+            entry["chunk_count"] = len(entry["chunk_ids"])
+        else:
+            for fname in change["filenames"]:
+                self.entries.pop(fname, None)
+
+        if log:
+            self.journal.append(change)
+
+    def _compact(self):
+        self.journal.compact(
+            {"op": "add", "filename": fname, "upload_date": entry["upload_date"], "chunk_ids": entry["chunk_ids"]}
+            for fname, entry in self.entries.items()
+        )
@@ -0,0 +1,85 @@
+import time
+
+AGGREGATIONS = ["max", "sum_top_n", "rrf"]
+
+
+def aggregate_resumes(scored_chunks, method="sum_top_n", top_n=3, rrf_k=60):
+    """
+    Turn ranked (filename, chunk_text, score) hits into a ranked candidate list.
+
+    method="max" scores a resume by its best chunk, "sum_top_n" by the sum of
+    its top_n chunk scores and "rrf" by reciprocal rank fusion over the chunk
+    ranks (sum of 1 / (rrf_k + rank)). Hits must be ordered best first.
+    Returns [{"filename", "score", "chunks"}] sorted by score, best first.
+    """
+    if method not in AGGREGATIONS:
+        raise ValueError(f"Unknown aggregation: {method}")
+
+    per_resume = {}
+    for rank, (fname, text, score) in enumerate(scored_chunks, 1):
+        entry = per_resume.setdefault(fname, {"filename": fname, "scores": [], "ranks": [], "chunks": []})
+        entry["scores"].append(score)
+        entry["ranks"].append(rank)
+        entry["chunks"].append(text)
+
+    ranked = []
+    for entry in per_resume.values():
+        if method == "max":
+            score = max(entry["scores"])
+        elif method == "sum_top_n":
+            score = sum(sorted(entry["scores"], reverse=True)[:top_n])
+        else:
+            score = sum(1 / (rrf_k + r) for r in entry["ranks"][:top_n])
+        ranked.append({"filename": entry["filename"], "score": score, "chunks": entry["chunks"]})
+
+    ranked.sort(key=lambda r: r["score"], reverse=True)
+    return ranked
+
+
+def first_seen(scored_chunks, num_resumes):
+    """The old behaviour: group by filename in order of first appearance."""
+    grouped = {}
+    for fname, text, _ in scored_chunks:
+        grouped.setdefault(fname, []).append(text)
+    return [{"filename": f, "chunks": c} for f, c in list(grouped.items())[:num_resumes]]
+
+
+if __name__ == "__main__":
+    import numpy as np
+
+    # synthetic corpus: each resume has a latent profile, its chunks are noisy views of it
+    rng = np.random.default_rng(0)
+    n_resumes, chunks_per_resume, dim, queries, k = 2000, 8, 64, 200, 5
+
+    profiles = rng.normal(size=(n_resumes, dim))
+    profiles /= np.linalg.norm(profiles, axis=1, keepdims=True)
+    chunks = np.repeat(profiles, chunks_per_resume, axis=0) + rng.normal(scale=0.15, size=(n_resumes * chunks_per_resume, dim))
+    chunks /= np.linalg.norm(chunks, axis=1, keepdims=True)
+    owner = np.repeat(np.arange(n_resumes), chunks_per_resume)
+
+    def recall(ranked, truth):
+        return len({r["filename"] for r in ranked[:k]} & truth) / k
+
+    results = {name: [] for name in ["first_seen (k=15)"] + [f"{m} (k=100)" for m in AGGREGATIONS]}
+    latency = {name: 0.0 for name in results}
+
+    for _ in range(queries):
+        q = rng.normal(size=dim)
+        q /= np.linalg.norm(q)
+        truth = set(np.argsort(-(profiles @ q))[:k].tolist())
+
+        sims = chunks @ q
+        order = np.argsort(-sims)
+        hits = [(int(owner[i]), "", float(sims[i])) for i in order[:100]]
+
+        start = time.perf_counter()
+        results["first_seen (k=15)"].append(recall(first_seen(hits[:min(k * 3, 20)], k), truth))
+        latency["first_seen (k=15)"] += time.perf_counter() - start
+        for m in AGGREGATIONS:
+            start = time.perf_counter()
+            results[f"{m} (k=100)"].append(recall(aggregate_resumes(hits, m), truth))
+            latency[f"{m} (k=100)"] += time.perf_counter() - start
+
+    print(f"{n_resumes} resumes x {chunks_per_resume} chunks, {queries} queries, recall@{k}")
+    for name, values in results.items():
+        print(f"  {name:<20} recall={np.mean(values):.3f}  aggregation={latency[name] / queries * 1000:.3f}ms/query")
@@ -0,0 +1,254 @@
+"""
+Retrieval benchmark for the Chroma HNSW stores used by the resume apps.
+
+For each corpus size and HNSW setting (M, ef_construction, ef_search) a
+synthetic resume corpus is ingested into a fresh persisted collection in a
+separate process, then measured for ingest throughput, query latency
+p50/p99, recall@k against brute-force cosine search and the resident
+memory the index added. Results are written as JSON for tracking regressions.
+
+    python retrieval_benchmark.py --sizes 1000 10000 100000 --m 16 32 --ef-search 10 50 100
+    python retrieval_benchmark.py --sizes 500000 --embed --output big.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import random
+import argparse
+import itertools
+import platform
+import tempfile
+import multiprocessing
+from datetime import datetime
+
+import numpy as np
+
+ROLES = {
+    "Backend Engineer": ["python", "django", "postgresql", "redis", "docker", "rest api", "celery"],
+    "Data Engineer": ["spark", "airflow", "kafka", "sql", "hadoop", "aws", "python"],
+    "Frontend Developer": ["react", "typescript", "redux", "css", "html", "javascript", "webpack"],
+    "ML Engineer": ["pytorch", "tensorflow", "scikit-learn", "nlp", "mlops", "python", "pandas"],
+    "DevOps Engineer": ["kubernetes", "terraform", "aws", "ci/cd", "linux", "prometheus", "docker"],
+    "Android Developer": ["kotlin", "java", "jetpack compose", "firebase", "gradle", "mvvm"],
+    "Data Analyst": ["excel", "power bi", "tableau", "sql", "statistics", "pandas"],
+    "Project Manager": ["agile", "scrum", "jira", "stakeholder management", "budgeting", "pmp"],
+}
+COMPANIES = ["Infosys", "TCS", "Wipro", "Accenture", "Flipkart", "Zoho", "Freshworks", "Razorpay"]
+SECTIONS = ["Summary", "Experience", "Projects", "Skills", "Education", "Certifications"]
+
+
+def synthetic_corpus(n, seed=0):
+    """n resume-like chunk texts and the role index each one was written for."""
+    rng = random.Random(seed)
+    roles = list(ROLES)
+    texts, labels = [], []
+    for i in range(n):
+        r = rng.randrange(len(roles))
+        skills = rng.sample(ROLES[roles[r]], 4)
+        texts.append(
+            f"{rng.choice(SECTIONS)}: {roles[r]} at {rng.choice(COMPANIES)} for {rng.randint(1, 12)} years. "
+            f"Worked with {', '.join(skills[:3])} and {skills[3]}; "
+            f"delivered project {i % 997} for client {rng.randint(1, 500)}."
+        )
+        labels.append(r)
+    return texts, labels
+
+
+def synthetic_queries(n, seed=1):
+    """n job-description-like queries and their role indexes."""
+    rng = random.Random(seed)
+    roles = list(ROLES)
+    texts, labels = [], []
+    for _ in range(n):
+        r = rng.randrange(len(roles))
+        texts.append(f"Looking for a {roles[r]} with {', '.join(rng.sample(ROLES[roles[r]], 3))}")
+        labels.append(r)
+    return texts, labels
+
+
+def clustered_vectors(labels, dim, seed=0):
+    """Fast stand-in for embeddings: one direction per role plus per-chunk noise, unit length."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(len(ROLES) * 16, dim)).astype(np.float32)
+    sub = rng.integers(0, 16, len(labels))
+    vectors = centers[np.asarray(labels) * 16 + sub] + rng.normal(scale=0.6, size=(len(labels), dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def rss_mb():
+    """
+    Anonymous resident memory of this process in MB, or None if unknown.
+
+    File-backed pages are left out, so the memory-mapped corpus being read
+    does not count as index memory.
+    """
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("RssAnon:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def brute_force(vectors, queries, k, block=100_000):
+    """Exact top-k row indices per query by cosine similarity."""
+    best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+    best_rows = np.zeros((len(queries), k), dtype=np.int64)
+    for start in range(0, len(vectors), block):
+        scores = queries @ np.asarray(vectors[start:start + block]).T
+        rows = np.arange(start, start + scores.shape[1])
+        merged_scores = np.concatenate([best_scores, scores], axis=1)
+        merged_rows = np.concatenate([best_rows, np.broadcast_to(rows, scores.shape)], axis=1)
+        top = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(merged_scores, top, axis=1)
+        best_rows = np.take_along_axis(merged_rows, top, axis=1)
+    return [set(rows.tolist()) for rows in best_rows]
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if values else None
+
+
+def run_config(config):
+    """
+    Build one collection and measure it; runs in its own process for a clean RSS.
+
+    ef_search is fixed when the collection is created: not every Chroma
+    version lets it change afterwards, so each value gets its own build.
+    """
+    import chromadb
+
+    vectors = np.load(config["vectors_path"], mmap_mode="r")
+    queries = np.load(config["queries_path"])
+    k = config["k"]
+    directory = tempfile.mkdtemp(prefix="chroma_bench_")
+    try:
+        client = chromadb.PersistentClient(path=directory)
+        metadata = {
+            "hnsw:space": "cosine",
+            "hnsw:M": config["m"],
+            "hnsw:construction_ef": config["ef_construction"],
+            "hnsw:search_ef": config["ef_search"]
+        }
+        collection = client.create_collection("bench", metadata=metadata)
+        batch_size = min(config["batch_size"], client.get_max_batch_size())
+
+        rss_before = rss_mb()
+        started = time.perf_counter()
+        for start in range(0, len(vectors), batch_size):
+            batch = np.asarray(vectors[start:start + batch_size])
+            collection.add(
+                ids=[str(i) for i in range(start, start + len(batch))],
+                embeddings=batch.tolist(),
+                metadatas=[{"row": i} for i in range(start, start + len(batch))]
+            )
+        ingest_seconds = time.perf_counter() - started
+        collection.query(query_embeddings=[queries[0].tolist()], n_results=k)  # loads the index
+        rss_after = rss_mb()
+
+        truth = brute_force(vectors, queries, k)
+        disk_bytes = sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(directory) for f in files)
+
+        latencies, hits = [], 0
+        for q, expected in zip(queries, truth):
+            t = time.perf_counter()
+            found = collection.query(query_embeddings=[q.tolist()], n_results=k, include=[])
+            latencies.append((time.perf_counter() - t) * 1000)
+            hits += len({int(i) for i in found["ids"][0]} & expected)
+
+        return {
+            "chunks": len(vectors),
+            "m": config["m"],
+            "ef_construction": config["ef_construction"],
+            "ef_search": config["ef_search"],
+            "ingest_seconds": ingest_seconds,
+            "ingest_chunks_per_sec": len(vectors) / ingest_seconds,
+            "query_p50_ms": percentile(latencies, 50),
+            "query_p99_ms": percentile(latencies, 99),
+            f"recall@{k}": hits / (k * len(queries)),
+            "index_rss_mb": rss_after - rss_before if rss_before is not None else None,
+            "disk_mb": disk_bytes / 1024 / 1024
+        }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def prepare_corpus(size, args, workdir):
+    """Write the corpus and query vectors for one size to .npy files; returns their paths."""
+    texts, labels = synthetic_corpus(size, args.seed)
+    query_texts, query_labels = synthetic_queries(args.queries, args.seed + 1)
+    if args.embed:
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer(args.model)
+        vectors = model.encode(texts, batch_size=256, normalize_embeddings=True, show_progress_bar=True)
+        queries = model.encode(query_texts, normalize_embeddings=True)
+    else:
+        vectors = clustered_vectors(labels, args.dim, args.seed)
+        queries = clustered_vectors(query_labels, args.dim, args.seed)
+    vectors_path = os.path.join(workdir, f"vectors_{size}.npy")
+    queries_path = os.path.join(workdir, f"queries_{size}.npy")
+    np.save(vectors_path, np.asarray(vectors, dtype=np.float32))
+    np.save(queries_path, np.asarray(queries, dtype=np.float32))
+    return vectors_path, queries_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--m", type=int, nargs="+", default=[16])
+    parser.add_argument("--ef-construction", type=int, nargs="+", default=[100])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--embed", action="store_true", help="embed the synthetic text with --model instead of clustered random vectors")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--output", default=f"retrieval_benchmark_{datetime.now():%Y%m%d_%H%M%S}.json")
+    args = parser.parse_args(argv)
+
+    import chromadb
+    report = {
+        "created": datetime.now().isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "chromadb": chromadb.__version__,
+        "args": vars(args),
+        "results": []
+    }
+
+    workdir = tempfile.mkdtemp(prefix="retrieval_bench_")
+    context = multiprocessing.get_context("spawn")
+    try:
+        for size in args.sizes:
+            vectors_path, queries_path = prepare_corpus(size, args, workdir)
+            for m, ef_construction, ef_search in itertools.product(args.m, args.ef_construction, args.ef_search):
+                config = {
+                    "vectors_path": vectors_path,
+                    "queries_path": queries_path,
+                    "m": m,
+                    "ef_construction": ef_construction,
+                    "ef_search": ef_search,
+                    "k": args.k,
+                    "batch_size": args.batch_size
+                }
+                with context.Pool(1) as pool:
+                    row = pool.apply(run_config, (config,))
+                report["results"].append(row)
+                print(json.dumps(row))
+                # written after every config so a long sweep keeps partial results
+                with open(args.output, "w", encoding="utf-8") as f:
+                    json.dump(report, f, indent=2)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(f"wrote {len(report['results'])} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
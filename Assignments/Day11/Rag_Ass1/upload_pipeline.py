@@ -0,0 +1,107 @@
+import json
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+# bytes one embedding dimension takes in a JSON request body
+BYTES_PER_DIMENSION = 12
+
+
+def chunk_ids(filename, texts):
+    """Deterministic chunk ids, so re-uploading after a failure overwrites instead of duplicating."""
+    content = hashlib.sha256("\x00".join(texts).encode("utf-8")).hexdigest()[:16]
+    name = hashlib.sha256(filename.encode("utf-8")).hexdigest()[:12]
+    return [f"{name}_{content}_{i}" for i in range(len(texts))]
+
+
+def plan_batches(texts, metadatas, max_batch_size=100, max_payload_bytes=4_000_000, dim=384):
+    """Split record indices into batches under both the record limit and the payload size limit."""
+    batches, batch, size = [], [], 0
+    for i, (text, meta) in enumerate(zip(texts, metadatas)):
+        record = len(text.encode("utf-8")) + len(json.dumps(meta)) + dim * BYTES_PER_DIMENSION
+        if batch and (len(batch) == max_batch_size or size + record > max_payload_bytes):
+            batches.append(batch)
+            batch, size = [], 0
+        batch.append(i)
+        size += record
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def pipelined_upsert(collection, embeddings, ids, texts, metadatas,
+                     max_batch_size=100, max_payload_bytes=4_000_000, guard=None, on_batch=None):
+    """
+    Embed and upsert records batch by batch, embedding batch N+1 while batch N is uploading.
+
+    Upserts use the caller's ids, so a retried upload is idempotent. If a
+    resilience.Resilient guard is given each batch upload goes through it.
+    on_batch(done, total) is called after each batch is stored.
+    Returns a dict with chunks, batches and seconds.
+    """
+    started = time.perf_counter()
+    batches = plan_batches(texts, metadatas, max_batch_size, max_payload_bytes)
+
+    done = 0
+
+    def upsert(batch, vectors):
+        nonlocal done
+        kwargs = {
+            "ids": [ids[i] for i in batch],
+            "documents": [texts[i] for i in batch],
+            "metadatas": [metadatas[i] for i in batch],
+            "embeddings": vectors
+        }
+        if guard is None:
+            collection.upsert(**kwargs)
+        else:
+            guard.call(collection.upsert, **kwargs)
+        done += 1
+        if on_batch is not None:
+            on_batch(done, len(batches))
+
+    with ThreadPoolExecutor(max_workers=1) as uploader:
+        in_flight = None
+        for batch in batches:
+            vectors = embeddings.embed_documents([texts[i] for i in batch])
+            if in_flight is not None:
+                in_flight.result()  # one upload in flight; surfaces its error
+            in_flight = uploader.submit(upsert, batch, vectors)
+        if in_flight is not None:
+            in_flight.result()
+
+    return {
+        "chunks": len(texts),
+        "batches": len(batches),
+        "seconds": time.perf_counter() - started
+    }
+
+
+if __name__ == "__main__":
+    # stand-ins: embedding costs 1ms per chunk, the server takes 20ms + 1ms per 20KB
+    class SlowEmbeddings:
+        def embed_documents(self, texts):
+            time.sleep(0.001 * len(texts))
+            return [[0.0] * 384 for _ in texts]
+
+    class SlowCollection:
+        def upsert(self, ids, documents, metadatas, embeddings):
+            payload = sum(len(d) for d in documents) + len(embeddings) * 384 * BYTES_PER_DIMENSION
+            time.sleep(0.02 + payload / 20_000 / 1000)
+
+    texts = [f"chunk {i} " * 100 for i in range(2000)]
+    metadatas = [{"filename": f"resume_{i // 10}.pdf"} for i in range(2000)]
+    ids = [str(i) for i in range(2000)]
+    embeddings, collection = SlowEmbeddings(), SlowCollection()
+
+    start = time.perf_counter()
+    for batch in plan_batches(texts, metadatas):
+        vectors = embeddings.embed_documents([texts[i] for i in batch])
+        collection.upsert([ids[i] for i in batch], [texts[i] for i in batch],
+                          [metadatas[i] for i in batch], vectors)
+    sequential = time.perf_counter() - start
+
+    stats = pipelined_upsert(collection, embeddings, ids, texts, metadatas)
+    print(f"sequential: {sequential:.2f}s")
+    print(f"pipelined:  {stats['seconds']:.2f}s over {stats['batches']} batches "
+          f"({sequential / stats['seconds']:.2f}x)")
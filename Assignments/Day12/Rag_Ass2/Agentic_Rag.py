@@ -1,6 +1,7 @@
 import os
+import sys
 import math
-import tempfile
+import time
 from datetime import datetime
 
 import streamlit as st
@@ -8,17 +9,61 @@ from dotenv import load_dotenv
 
 from langchain.tools import tool
 from langchain.agents import create_agent
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import Chroma
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_openai import ChatOpenAI
 
+# shared resume helpers are the resume_rag package under Assignments/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from resume_rag.embedding_cache import EmbeddingCache, CachedEmbeddings, CACHE_DIR
+from resume_rag.ingest_queue import IngestQueue, show_ingest_progress
+from resume_rag.pdf_parser import iter_pdf_pages
+from resume_rag.streaming_chunker import split_documents
+from resume_rag.bm25_index import BM25Index, fuse_scores
+from resume_rag.quantized_index import QuantizedIndex, query_collection
+from resume_rag.numpy_store import NumpyVectorStore, EmbeddingStore
+from resume_rag.response_cache import SemanticCache, normalize_query
+from skill_index import SkillIndex, extract_skills, extract_experience
+from reranker import CrossEncoderReranker, rerank_order
+from write_behind import GroupCommitWriter
+
+
+RUN_STARTED = time.perf_counter()
 
 load_dotenv()
 
 CHROMA_PATH = "./chroma_db"
 COLLECTION_NAME = "resumes"
+INGEST_WORKERS = 4
+
+# Optional compact vector search: "int8" or "binary" codes scanned in memory,
+# the top QUANTIZED_RESCORE_N re-scored with exact float vectors; None turns it off
+QUANTIZATION = None
+QUANTIZED_RESCORE_N = 100
+
+# Vector backend: "chroma", or "numpy" for in-process exact search over a memory-mapped matrix.
+# Quantized search always uses "numpy": re-scoring reads a few float rows from the
+# on-disk matrix, so Chroma's float copy and HNSW graph would only add memory and disk
+VECTOR_BACKEND = "numpy" if QUANTIZATION else "chroma"
+NUMPY_STORE_PATH = os.path.join(CHROMA_PATH, "numpy_store")
+
+# Write-behind uploads: group-commit to Chroma after this many chunks or seconds
+WRITE_BEHIND = True
+COMMIT_MAX_CHUNKS = 256
+COMMIT_MAX_DELAY = 5.0
+
+# Hybrid retrieval: candidates per stage and BM25 weight in the fused score
+RETRIEVE_K = 10
+HYBRID_ALPHA = 0.4
+
+# Optional cross-encoder re-ranking: over-fetch, then re-score within a latency budget
+RERANK_FETCH_K = 30
+RERANK_BATCH_SIZE = 16
+RERANK_BUDGET_MS = 800
+
+# Answer cache: job descriptions this similar, within this many seconds, reuse the answer
+RESPONSE_CACHE_THRESHOLD = 0.95
+RESPONSE_CACHE_TTL = 3600
 
 st.set_page_config(
     page_title="Agentic Resume RAG",
@@ -29,75 +74,211 @@ st.set_page_config(
 st.title("📄 Agentic RAG – AI Resume Shortlisting")
 
 
-def initialize_vector_store():
-    embeddings = HuggingFaceEmbeddings(
-        model_name="sentence-transformers/all-MiniLM-L6-v2"
-    )
-
-    return Chroma(
-        persist_directory=CHROMA_PATH,
-        embedding_function=embeddings,
-        collection_name=COLLECTION_NAME
-    )
-
-
-VECTOR_STORE = initialize_vector_store()
+# st.cache_resource keeps one instance per process: reruns and other sessions
+# reuse them, and each is built on first use rather than at import.
+# Chroma, SkillIndex and BM25Index serialise their own writes.
+
+@st.cache_resource
+def startup_timings():
+    return {}
+
+
+def timed_startup(name, build):
+    started = time.perf_counter()
+    resource = build()
+    startup_timings()[name] = (time.perf_counter() - started) * 1000
+    return resource
+
+
+@st.cache_resource(show_spinner="Loading embedding model...")
+def load_embeddings():
+    return timed_startup("embeddings_ms", lambda: CachedEmbeddings(
+        HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2"),
+        model_name="all-MiniLM-L6-v2",
+        cache=EmbeddingCache(os.path.join(CACHE_DIR, "agentic_rag"))
+    ))
+
+
+@st.cache_resource(show_spinner="Opening resume store...")
+def load_stores():
+    """The vector store, the skill, BM25 and optional quantized indexes kept beside it, and its write-behind writer."""
+    embeddings = load_embeddings()
+
+    def build():
+        if VECTOR_BACKEND == "numpy":
+            vector_store = EmbeddingStore(NumpyVectorStore(NUMPY_STORE_PATH), embeddings)
+        else:
+            vector_store = Chroma(
+                persist_directory=CHROMA_PATH,
+                embedding_function=embeddings,
+                collection_name=COLLECTION_NAME
+            )
+        skill_index = SkillIndex(os.path.join(CHROMA_PATH, "skill_index.json"))
+        bm25_index = BM25Index(os.path.join(CHROMA_PATH, "bm25_index.jsonl"))
+        if not len(bm25_index) and vector_store._collection.count():
+            bm25_index.rebuild(vector_store._collection)
+        if not len(skill_index) and vector_store._collection.count():
+            skill_index.rebuild(vector_store._collection)
+        writer = GroupCommitWriter(
+            vector_store,
+            os.path.join(CHROMA_PATH, "upload_wal.jsonl"),
+            max_chunks=COMMIT_MAX_CHUNKS,
+            max_delay=COMMIT_MAX_DELAY
+        ) if WRITE_BEHIND else None
+        quantized_index = None
+        if QUANTIZATION is not None:
+            quantized_index = QuantizedIndex(os.path.join(NUMPY_STORE_PATH, f"vectors_{QUANTIZATION}"), mode=QUANTIZATION)
+            if not len(quantized_index) and vector_store._collection.count():
+                quantized_index.rebuild(vector_store._collection)
+        return vector_store, skill_index, bm25_index, writer, quantized_index
+
+    return timed_startup("stores_ms", build)
+
+
+@st.cache_resource(show_spinner="Loading re-ranker...")
+def load_reranker():
+    return timed_startup("reranker_ms", lambda: CrossEncoderReranker(
+        batch_size=RERANK_BATCH_SIZE,
+        budget_ms=RERANK_BUDGET_MS
+    ))
+
+
+@st.cache_resource
+def load_response_cache():
+    return SemanticCache(threshold=RESPONSE_CACHE_THRESHOLD, ttl=RESPONSE_CACHE_TTL)
 
 
 def process_pdf(uploaded_file):
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-        tmp.write(uploaded_file.getvalue())
-        tmp_path = tmp.name
-
-    loader = PyPDFLoader(tmp_path)
-    docs = loader.load()
-    os.unlink(tmp_path)
-
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200
-    )
+    # UploadedFile is an in-memory buffer: parse it directly, no temp file,
+    # and chunk each page as it is extracted
+    pages = iter_pdf_pages(uploaded_file, uploaded_file.name)
 
-    return splitter.split_documents(docs)
+    return list(split_documents(pages, chunk_size=1000, chunk_overlap=200))
 
 
-def upload_resume(uploaded_file):
+def upload_resume(uploaded_file, stores, report=lambda stage: None, response_cache=None):
+    vector_store, skill_index, bm25_index, writer, quantized_index = stores
+    report("parsing")
     chunks = process_pdf(uploaded_file)
 
+    # extracted once per resume, not per query
+    report("extracting skills")
+    full_text = "\n".join(chunk.page_content for chunk in chunks)
+    skills = extract_skills(full_text)
+    experience = extract_experience(full_text)
+
     for chunk in chunks:
         chunk.metadata.update({
             "filename": uploaded_file.name,
             "upload_date": datetime.now().isoformat(),
-            "skills": "",
-            "experience": 0
+            "skills": ",".join(sorted(skills)),
+            "experience": experience
         })
 
-    VECTOR_STORE.add_documents(chunks)
-    VECTOR_STORE.persist()
-
-
-@tool
-def retrive(job_description: str, top_k: int = 3) -> str:
+    report("embedding and storing")
+    if writer:
+        # logged durably now, written to Chroma with the next group commit
+        ids = writer.add(
+            [chunk.page_content for chunk in chunks],
+            [chunk.metadata for chunk in chunks]
+        )
+    else:
+        ids = vector_store.add_documents(chunks)
+        vector_store.persist()
+    bm25_index.add_many(zip(ids, (chunk.page_content for chunk in chunks)))
+    if quantized_index is not None:
+        # served from the embedding cache when Chroma embeds the same texts
+        quantized_index.add(ids, vector_store.embeddings.embed_documents([c.page_content for c in chunks]))
+    skill_index.add(uploaded_file.name, skills, experience)
+    if response_cache is not None:
+        # a new resume can change any cached answer
+        response_cache.clear()
+    return len(chunks)
+
+
+def rank_resumes(job_description, top_k, stores, reranker=None):
     """
-    Retrieve and rank resumes using vector similarity and metadata.
-    Uses only uploaded resumes and never hallucinates.
+    Hybrid retrieval and ranking behind the agent's tool; re-ranks with
+    `reranker` when one is given. Returns (tool output, diagnostics) where
+    diagnostics holds per-stage timings and the matched filenames.
     """
-
-    results = VECTOR_STORE.similarity_search_with_score(job_description, k=10)
+    vector_store, skill_index, bm25_index, writer, quantized_index = stores
+    fetch_k = RERANK_FETCH_K if reranker else RETRIEVE_K
+
+    timings = {}
+    if writer:
+        # read your own uploads: commit anything still buffered
+        started = time.perf_counter()
+        writer.flush()
+        timings["commit_ms"] = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    lexical = bm25_index.search(job_description, k=fetch_k)
+    timings["bm25_ms"] = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    query_vector = vector_store.embeddings.embed_query(job_description)
+    timings["embed_ms"] = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    if quantized_index is not None:
+        found = query_collection(
+            vector_store._collection, quantized_index, query_vector, fetch_k,
+            rescore_n=max(QUANTIZED_RESCORE_N, fetch_k),
+            include=["documents", "metadatas"]
+        )
+    else:
+        found = vector_store._collection.query(
+            query_embeddings=[query_vector],
+            n_results=fetch_k,
+            include=["documents", "metadatas", "distances"]
+        )
+    timings["vector_ms"] = (time.perf_counter() - started) * 1000
+
+    # fuse lexical and vector rankings; fetch text for BM25-only hits
+    started = time.perf_counter()
+    chunks = {
+        cid: (text, meta)
+        for cid, text, meta in zip(found["ids"][0], found["documents"][0], found["metadatas"][0])
+    }
+    fused = fuse_scores(
+        lexical,
+        [(cid, -d) for cid, d in zip(found["ids"][0], found["distances"][0])],
+        HYBRID_ALPHA
+    )[:fetch_k]
+    missing = [cid for cid, _ in fused if cid not in chunks]
+    if missing:
+        extra = vector_store._collection.get(ids=missing, include=["documents", "metadatas"])
+        chunks.update(zip(extra["ids"], zip(extra["documents"], extra["metadatas"])))
+    timings["fusion_ms"] = (time.perf_counter() - started) * 1000
+
+    # (chunk, relevance, tier): lower tiers always rank first
+    results = [(chunks[cid], score, 0) for cid, score in fused if cid in chunks]
+
+    # cross-encoder relevance replaces the fused score for every pair scored
+    # within budget; the unscored tail ranks after them, in fused order
+    if reranker and results:
+        scores, stats = reranker.score(job_description, [text for (text, _), _, _ in results])
+        results = [
+            (results[i][0], results[i][1], 1) if scores[i] is None else (results[i][0], scores[i], 0)
+            for i in rerank_order(scores)
+        ]
+        timings["rerank_ms"] = stats["ms"]
 
     if not results:
-        return "No relevant resumes found."
+        return "No relevant resumes found.", {"timings": timings, "files": []}
 
-    job_tokens = set(job_description.lower().split())
+    # one inverted-index lookup for the whole query
+    job_skills = extract_skills(job_description)
+    skill_matches = skill_index.match(job_skills)
     ranked = []
 
-    for doc, distance in results:
-        meta = doc.metadata
+    for (content, meta), relevance, tier in results:
+        fname = meta.get("filename", "Unknown")
 
-        skills = set(meta.get("skills", "").lower().split(","))
-        skill_score = len(job_tokens & skills)
+        skill_score = skill_matches.get(fname, 0) / len(job_skills) if job_skills else 0
 
-        experience = meta.get("experience", 0)
+        experience = skill_index.profile(fname)["experience"] or meta.get("experience", 0)
         exp_score = min(experience / 10, 1.0)
 
         recency_score = 0
@@ -108,7 +289,7 @@ def retrive(job_description: str, top_k: int = 3) -> str:
             recency_score = math.exp(-days_old / 180)
 
         final_score = (
-            (1 - distance) * 0.5 +
+            relevance * 0.5 +
             skill_score * 0.3 +
             exp_score * 0.1 +
             recency_score * 0.1
@@ -116,11 +297,13 @@ def retrive(job_description: str, top_k: int = 3) -> str:
 
         ranked.append({
             "score": final_score,
-            "filename": meta.get("filename", "Unknown"),
-            "content": doc.page_content
+            "tier": tier,
+            "filename": fname,
+            "content": content
         })
 
-    ranked.sort(key=lambda x: x["score"], reverse=True)
+    # stable sort: within the unscored tail the fused order is kept
+    ranked.sort(key=lambda x: (x["tier"], -x["score"] if x["tier"] == 0 else 0))
     ranked = ranked[:top_k]
 
     output = []
@@ -129,41 +312,128 @@ def retrive(job_description: str, top_k: int = 3) -> str:
             f"\n--- Rank {i}: {r['filename']} ---\n{r['content']}"
         )
 
-    return "\n".join(output)
+    return "\n".join(output), {"timings": timings, "files": [r["filename"] for r in ranked]}
 
 
-llm = ChatOpenAI(
-    model="gemma-2-9b-it",
-    base_url="http://127.0.0.1:1234/v1",
-    api_key="not-needed",
-    temperature=0
-)
+def make_retrieval_tool(stores, reranker=None):
+    """
+    The agent's tool, bound to resources resolved on the script thread:
+    LangGraph runs sync tools on an executor thread that has no Streamlit
+    session. Diagnostics come back as the ToolMessage artifact.
+    """
+    @tool(response_format="content_and_artifact")
+    def retrive(job_description: str, top_k: int = 3) -> tuple[str, dict]:
+        """
+        Retrieve and rank resumes using vector similarity and metadata.
+        Uses only uploaded resumes and never hallucinates.
+        """
+        return rank_resumes(job_description, top_k, stores, reranker)
+
+    return retrive
+
+
+@st.cache_resource(show_spinner="Starting agent...")
+def load_agent(rerank=False):
+    # one agent per re-rank setting, its tool bound to the shared resources
+    retrieval_tool = make_retrieval_tool(load_stores(), load_reranker() if rerank else None)
+
+    def build():
+        llm = ChatOpenAI(
+            model="gemma-2-9b-it",
+            base_url="http://127.0.0.1:1234/v1",
+            api_key="not-needed",
+            temperature=0
+        )
 
-agent = create_agent(
-    model=llm,
-    tools=[retrive],
-    system_prompt=(
-        "You are an experienced HR recruiter. "
-        "Use tools only for job description queries. "
-        "Do not hallucinate. Answer strictly from retrieved resumes."
-    )
-)
+        return create_agent(
+            model=llm,
+            tools=[retrieval_tool],
+            system_prompt=(
+                "You are an experienced HR recruiter. "
+                "Use tools only for job description queries. "
+                "Do not hallucinate. Answer strictly from retrieved resumes."
+            )
+        )
+
+    return timed_startup("agent_ms", build)
 
 
 user_input = st.chat_input("Paste job description here...")
 
 if user_input:
-    response = agent.invoke({
-        "messages": [{"role": "user", "content": user_input}]
-    })
-    st.write("### 🤖 AI Recommendation")
-    st.write(response["messages"][-1].content)
-
+    started = time.perf_counter()
+    response_cache = load_response_cache()
+    key = load_embeddings().embed_query(normalize_query(user_input))
+    rerank = st.session_state.get("rerank", False)
+    params = (rerank,)
+    generation = response_cache.generation
+    hit = response_cache.get(key, params)
+
+    if hit:
+        answer, similarity = hit
+    else:
+        st.session_state.pop("retrieval_timings", None)
+        response = load_agent(rerank).invoke({
+            "messages": [{"role": "user", "content": user_input}]
+        })
+        answer = response["messages"][-1].content
+        # diagnostics of every retrieval the agent made, from the tool messages
+        retrievals = [m.artifact for m in response["messages"] if getattr(m, "artifact", None)]
+        if retrievals:
+            st.session_state.retrieval_timings = retrievals[-1]["timings"]
+        response_cache.put(key, answer, {f for r in retrievals for f in r["files"]}, params, generation)
+    st.session_state.interaction_ms = (time.perf_counter() - started) * 1000
 
-st.sidebar.header("📤 Upload Resume")
-uploaded_file = st.sidebar.file_uploader("Upload PDF Resume", type="pdf")
+    st.write("### 🤖 AI Recommendation")
+    st.write(answer)
+    if hit:
+        st.caption(f"⚡ Cached answer (similarity {similarity:.3f}, {st.session_state.interaction_ms:.0f} ms)")
+    elif "retrieval_timings" in st.session_state:
+        st.caption(" · ".join(f"{stage} {ms:.1f}" for stage, ms in st.session_state.retrieval_timings.items()))
+
+
+st.sidebar.header("📤 Upload Resumes")
+uploaded_files = st.sidebar.file_uploader("Upload PDF Resumes", type="pdf", accept_multiple_files=True)
+
+if uploaded_files and st.sidebar.button("Upload Resumes"):
+    if "ingest_queue" not in st.session_state:
+        # resolved here, on the script thread, and handed to the workers
+        stores, response_cache = load_stores(), load_response_cache()
+        st.session_state.ingest_queue = IngestQueue(
+            lambda f, report: upload_resume(f, stores, report, response_cache),
+            workers=INGEST_WORKERS
+        )
+    for f in uploaded_files:
+        st.session_state.ingest_queue.submit(f)
+    st.sidebar.success(f"Queued {len(uploaded_files)} resume(s) for upload")
+
+st.sidebar.toggle(
+    "Cross-encoder re-ranking",
+    key="rerank",
+    help=f"Re-score the top {RERANK_FETCH_K} chunks, within {RERANK_BUDGET_MS} ms"
+)
 
-if uploaded_file and st.sidebar.button("Upload Resume"):
-    upload_resume(uploaded_file)
-    st.sidebar.success("Resume uploaded successfully!")
+if "ingest_queue" in st.session_state:
+    with st.sidebar:
+        show_ingest_progress(st.session_state.ingest_queue)
+
+with st.sidebar.expander("⏱️ Timings"):
+    for name, ms in startup_timings().items():
+        st.write(f"Startup {name}: {ms:.0f}")
+    if "interaction_ms" in st.session_state:
+        st.write(f"Last query: {st.session_state.interaction_ms:.0f} ms")
+    writer = load_stores()[3] if "ingest_queue" in st.session_state else None
+    if writer:
+        stats = writer.stats()
+        st.write(
+            f"Uploads: {stats['pending']} chunks pending, "
+            f"{stats['commits']} commits, {stats['chunks_per_commit']:.0f} chunks/commit"
+        )
+    cache_stats = load_response_cache().stats()
+    st.write(
+        f"Answer cache: {cache_stats['hit_rate']:.0%} hit rate, "
+        f"{cache_stats['hits']}/{cache_stats['hits'] + cache_stats['misses']} lookups, "
+        f"{cache_stats['entries']} entries"
+    )
+    st.write(f"This rerun: {(time.perf_counter() - RUN_STARTED) * 1000:.0f} ms")
 
@@ -0,0 +1,137 @@
+import os
+import re
+import json
+import threading
+from datetime import datetime
+
+# canonical skill -> extra spellings found in resumes and job descriptions
+SKILLS = {
+    "python": [], "java": [], "javascript": ["js"], "typescript": [], "c++": ["cpp"],
+    "c#": ["csharp"], "golang": ["go lang"], "rust": [], "sql": [], "mysql": [], "postgresql": ["postgres"],
+    "mongodb": ["mongo"], "redis": [], "html": [], "css": [], "react": ["reactjs", "react.js"],
+    "angular": [], "vue": ["vuejs", "vue.js"], "node.js": ["nodejs"], "django": [],
+    "flask": [], "fastapi": [], "spring": ["spring boot"], "docker": [], "kubernetes": ["k8s"],
+    "aws": ["amazon web services"], "azure": [], "gcp": ["google cloud"], "linux": [], "git": [],
+    "ci/cd": ["jenkins", "github actions"], "terraform": [], "spark": ["pyspark"], "hadoop": [],
+    "kafka": [], "airflow": [], "pandas": [], "numpy": [], "scikit-learn": ["sklearn"],
+    "tensorflow": [], "pytorch": ["torch"], "machine learning": ["ml"], "deep learning": ["dl"],
+    "nlp": ["natural language processing"], "computer vision": ["opencv"], "llm": ["large language models"],
+    "langchain": [], "rag": ["retrieval augmented generation"], "generative ai": ["genai", "gen ai"],
+    "power bi": ["powerbi"], "tableau": [], "excel": [], "rest api": ["restful", "rest apis"],
+    "microservices": [], "agile": ["scrum"], "streamlit": []
+}
+
+_SKILL_PATTERNS = [
+    (skill, re.compile(r"(?<![\w+#.])(" + "|".join(re.escape(s) for s in [skill] + aliases) + r")(?![\w+#])"))
+    for skill, aliases in SKILLS.items()
+]
+_YEARS_PATTERN = re.compile(r"(\d{1,2}(?:\.\d)?)\s*\+?\s*(?:years|yrs|year)", re.IGNORECASE)
+_RANGE_PATTERN = re.compile(r"((?:19|20)\d{2})\s*(?:-|–|to)\s*((?:19|20)\d{2}|present|current|now)", re.IGNORECASE)
+
+
+def extract_skills(text):
+    """Canonical skills mentioned in the text."""
+    text = text.lower()
+    return {skill for skill, pattern in _SKILL_PATTERNS if pattern.search(text)}
+
+
+def extract_experience(text):
+    """
+    Years of experience: the largest "N years" claim, otherwise the span
+    covered by date ranges such as "2018 - 2022" or "2020 – Present".
+    """
+    claims = [float(y) for y in _YEARS_PATTERN.findall(text) if float(y) <= 50]
+    if claims:
+        return max(claims)
+
+    this_year = datetime.now().year
+    starts, ends = [], []
+    for start, end in _RANGE_PATTERN.findall(text):
+        starts.append(int(start))
+        ends.append(this_year if not end.isdigit() else int(end))
+    if not starts:
+        return 0.0
+    return float(max(0, min(max(ends), this_year) - min(starts)))
+
+
+class SkillIndex:
+    """
+    Skill -> resumes inverted index plus per-resume skills and experience,
+    persisted as JSON next to the vector store.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.resumes = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.resumes = json.load(f)
+        self.by_skill = {}
+        for fname, profile in self.resumes.items():
+            for skill in profile["skills"]:
+                self.by_skill.setdefault(skill, set()).add(fname)
+
+    def __len__(self):
+        return len(self.resumes)
+
+    def add(self, filename, skills, experience):
+        with self.lock:
+            self._drop(filename)
+            self.resumes[filename] = {"skills": sorted(skills), "experience": experience}
+            for skill in skills:
+                self.by_skill.setdefault(skill, set()).add(filename)
+            self._save()
+
+    def rebuild(self, collection, page_size=1000):
+        """Re-extract every resume already stored in a Chroma collection, once per filename."""
+        texts = {}
+        offset = 0
+        while True:
+            page = collection.get(include=["documents", "metadatas"], limit=page_size, offset=offset)
+            for text, meta in zip(page["documents"], page["metadatas"]):
+                texts.setdefault((meta or {}).get("filename", "Unknown"), []).append(text or "")
+            if len(page["ids"]) < page_size:
+                break
+            offset += page_size
+
+        resumes = {}
+        for fname, chunks in texts.items():
+            full_text = "\n".join(chunks)
+            resumes[fname] = {"skills": sorted(extract_skills(full_text)), "experience": extract_experience(full_text)}
+        with self.lock:
+            self.resumes = resumes
+            self.by_skill = {}
+            for fname, profile in resumes.items():
+                for skill in profile["skills"]:
+                    self.by_skill.setdefault(skill, set()).add(fname)
+            self._save()
+
+    def remove(self, filename):
+        with self.lock:
+            self._drop(filename)
+            self._save()
+
+    def match(self, skills):
+        """filename -> number of the given skills the resume has, only for resumes with a match."""
+        # under the lock: ingest workers add and drop resumes while queries run
+        counts = {}
+        with self.lock:
+            for skill in skills:
+                for fname in self.by_skill.get(skill, ()):
+                    counts[fname] = counts.get(fname, 0) + 1
+        return counts
+
+    def profile(self, filename):
+        with self.lock:
+            return dict(self.resumes.get(filename, {"skills": [], "experience": 0.0}))
+
+    def _drop(self, filename):
+        for skill in self.resumes.pop(filename, {"skills": []})["skills"]:
+            self.by_skill.get(skill, set()).discard(filename)
+
+    def _save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.resumes, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,54 @@
+import shutil
+import time
+
+from write_behind import GroupCommitWriter
+
+
+class FlakyStore:
+    def __init__(self, failures):
+        self.failures = failures
+        self.rows = {}
+
+    def add_texts(self, texts, metadatas=None, ids=None):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("store unavailable")
+        self.rows.update(zip(ids, texts))
+
+
+def test_failed_commit_still_acknowledges_the_upload(tmp_path):
+    store = FlakyStore(failures=1)
+    writer = GroupCommitWriter(store, str(tmp_path / "wal.jsonl"), max_chunks=2, max_delay=0.05)
+
+    ids = writer.add(["a", "b"], [{}, {}])
+
+    assert len(ids) == 2
+    assert writer.stats()["pending"] == 2
+    assert writer.stats()["failed_commits"] == 1
+    assert writer.timer is not None
+
+
+def test_retry_timer_commits_after_failures(tmp_path):
+    store = FlakyStore(failures=2)
+    writer = GroupCommitWriter(store, str(tmp_path / "wal.jsonl"), max_chunks=2, max_delay=0.05)
+
+    ids = writer.add(["a", "b"], [{}, {}])
+    deadline = time.monotonic() + 2
+    while not store.rows and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert store.rows == dict(zip(ids, ["a", "b"]))
+    assert writer.stats()["pending"] == 0
+    assert not (tmp_path / "wal.jsonl.committing").exists()
+
+
+def test_log_is_replayed_after_a_crash(tmp_path):
+    crashed = GroupCommitWriter(FlakyStore(failures=1), str(tmp_path / "wal.jsonl"), max_chunks=2, max_delay=60)
+    ids = crashed.add(["a", "b"], [{}, {}])
+    crashed.timer.cancel()
+    shutil.copy(tmp_path / "wal.jsonl", tmp_path / "restart.jsonl")
+
+    store = FlakyStore(failures=0)
+    GroupCommitWriter(store, str(tmp_path / "restart.jsonl"))
+
+    assert store.rows == dict(zip(ids, ["a", "b"]))
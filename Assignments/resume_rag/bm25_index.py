@@ -0,0 +1,160 @@
+import re
+import math
+import heapq
+import threading
+from collections import Counter
+
+from .journal import Journal
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+
+def tokenize(text):
+    """Lowercase word tokens that keep names like c++, c#, node.js and ci/cd parts intact."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """
+    Incremental BM25 index over chunk ids, kept next to the vector store.
+
+    Postings live in memory; adds and removes are appended to a JSON-lines
+    journal that is replayed and compacted on load.
+    """
+
+    def __init__(self, path, k1=1.5, b=0.75):
+        self.journal = Journal(path)
+        self.k1 = k1
+        self.b = b
+        self.lock = threading.Lock()
+        self.docs = {}       # chunk id -> {term: count}
+        self.lengths = {}    # chunk id -> token count
+        self.postings = {}   # term -> {chunk id: count}
+        self.total_length = 0
+        for change in self.journal.replay():
+            self._apply(change)
+        if self.journal.lines > 1:
+            self._compact()
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add_many(self, items):
+        """Index (chunk_id, text) pairs; re-adding an id replaces its old text."""
+        change = {"op": "add", "docs": {cid: Counter(tokenize(text)) for cid, text in items}}
+        with self.lock:
+            self._apply(change)
+            self.journal.append(change)
+
+    def remove(self, chunk_ids):
+        with self.lock:
+            chunk_ids = [cid for cid in chunk_ids if cid in self.docs]
+            if not chunk_ids:
+                return
+            change = {"op": "remove", "ids": chunk_ids}
+            self._apply(change)
+            self.journal.append(change)
+
+    def rebuild(self, collection, page_size=1000):
+        """Re-index every chunk already stored in a Chroma collection."""
+        self.clear()
+        offset = 0
+        while True:
+            page = collection.get(include=["documents"], limit=page_size, offset=offset)
+            self.add_many(zip(page["ids"], page["documents"]))
+            if len(page["ids"]) < page_size:
+                break
+            offset += page_size
+
+    def clear(self):
+        with self.lock:
+            self.docs, self.lengths, self.postings, self.total_length = {}, {}, {}, 0
+            self._compact()
+
+    def search(self, query, k=10):
+        """Top-k (chunk_id, score) pairs for the query, best first."""
+        terms = set(tokenize(query))
+        scores = {}
+        # scored under the lock: ingest workers add and remove chunks concurrently
+        with self.lock:
+            if not terms or not self.docs:
+                return []
+            n = len(self.docs)
+            avg_length = self.total_length / n
+            for term in terms:
+                posting = self.postings.get(term)
+                if not posting:
+                    continue
+                idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+                for cid, tf in posting.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.lengths[cid] / avg_length)
+                    scores[cid] = scores.get(cid, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    def _apply(self, change):
+        if change["op"] == "add":
+            self._remove_ids(list(change["docs"]))
+            for cid, counts in change["docs"].items():
+                self.docs[cid] = counts
+                self.lengths[cid] = sum(counts.values())
+                self.total_length += self.lengths[cid]
+                for term, tf in counts.items():
+                    self.postings.setdefault(term, {})[cid] = tf
+        else:
+            self._remove_ids(change["ids"])
+
+    def _remove_ids(self, chunk_ids):
+        for cid in chunk_ids:
+            counts = self.docs.pop(cid, None)
+            if counts is None:
+                continue
+            self.total_length -= self.lengths.pop(cid)
+            for term in counts:
+                posting = self.postings[term]
+                posting.pop(cid, None)
+                if not posting:
+                    del self.postings[term]
+
+    def _compact(self):
+        self.journal.compact([{"op": "add", "docs": self.docs}])
+
+
+def fuse_scores(lexical, vector, alpha=0.5):
+    """
+    Combine (id, score) lists from BM25 and vector search into one ranking.
+
+    Each list is min-max normalised to 0..1 and mixed as
+    alpha * lexical + (1 - alpha) * vector; an id missing from a list
+    scores 0 there. Returns [(id, fused_score)] best first.
+    """
+    def normalise(hits):
+        if not hits:
+            return {}
+        values = [score for _, score in hits]
+        low, high = min(values), max(values)
+        return {cid: (score - low) / (high - low) if high > low else 1.0 for cid, score in hits}
+
+    lex, vec = normalise(lexical), normalise(vector)
+    fused = {cid: alpha * lex.get(cid, 0.0) + (1 - alpha) * vec.get(cid, 0.0) for cid in {**lex, **vec}}
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+
+if __name__ == "__main__":
+    import os
+    import time
+    import random
+    import tempfile
+
+    random.seed(0)
+    vocab = [f"word{i}" for i in range(5000)] + ["python", "django", "kubernetes", "pmp", "aws"]
+    index = BM25Index(os.path.join(tempfile.mkdtemp(), "bm25.jsonl"))
+
+    start = time.perf_counter()
+    for batch in range(100):
+        index.add_many((f"c{batch}_{i}", " ".join(random.choices(vocab, k=150))) for i in range(1000))
+    print(f"indexed {len(index)} chunks in {time.perf_counter() - start:.1f}s")
+
+    for query in ["kubernetes", "python django aws", "pmp certification"]:
+        start = time.perf_counter()
+        hits = index.search(query, k=10)
+        print(f"{query!r}: {len(hits)} hits in {(time.perf_counter() - start) * 1000:.1f}ms")
@@ -0,0 +1,165 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from .journal import Journal
+
+CACHE_DIR = os.getenv(
+    "EMBEDDING_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "resume_embeddings")
+)
+PENDING_LIMIT = 4096   # journal entries held in memory before get() appends them
+
+
+def text_key(model_name, text):
+    """Cache key for one chunk: model name plus SHA-256 of the chunk text."""
+    return f"{model_name}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+
+def _fingerprint(key):
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class EmbeddingCache:
+    """
+    Size-bounded LRU cache of embeddings stored in a memory-mapped array on disk.
+
+    vectors.npy holds one row per slot, keys.npy a fingerprint of the key that
+    owns each slot and index.jsonl a journal of key -> slot assignments in LRU
+    order. flush() only appends what changed since the last flush; the journal
+    is rewritten once it grows past a few times the capacity. Slot allocation
+    lives in this process only, so each app opens its own directory under
+    CACHE_DIR; a lookup only counts as a hit if the slot fingerprint matches,
+    so a torn flush never returns a vector under the wrong key.
+    """
+
+    def __init__(self, path, dim=384, capacity=200_000, dtype="float16"):
+        os.makedirs(path, exist_ok=True)
+        self.journal = Journal(os.path.join(path, "index.jsonl"))
+        vectors_path = os.path.join(path, "vectors.npy")
+        keys_path = os.path.join(path, "keys.npy")
+
+        self.lock = threading.Lock()
+        self.slots = OrderedDict()
+        self.pending = []   # [key, slot] pairs touched since the last flush
+        self.hits = 0
+        self.misses = 0
+        self.dim, self.capacity, self.dtype = dim, capacity, dtype
+
+        header = self._load()
+        if header == {"dim": dim, "capacity": capacity, "dtype": dtype}:
+            self.vectors = np.lib.format.open_memmap(vectors_path, mode="r+")
+            self.keys = np.lib.format.open_memmap(keys_path, mode="r+")
+        else:
+            # new cache, or the layout changed: start from scratch
+            self.vectors = np.lib.format.open_memmap(
+                vectors_path, mode="w+", dtype=dtype, shape=(capacity, dim))
+            self.keys = np.lib.format.open_memmap(
+                keys_path, mode="w+", dtype=np.uint64, shape=(capacity,))
+            self.slots.clear()
+            self._compact()
+
+        self.free = sorted(set(range(capacity)) - set(self.slots.values()), reverse=True)
+
+    def get(self, key):
+        """Return the cached vector as float32, or None on a miss."""
+        with self.lock:
+            slot = self.slots.get(key)
+            if slot is None or int(self.keys[slot]) != _fingerprint(key):
+                self.misses += 1
+                return None
+            self.slots.move_to_end(key)
+            self.pending.append([key, slot])
+            if len(self.pending) >= PENDING_LIMIT:
+                self._append_pending()
+            self.hits += 1
+            return np.asarray(self.vectors[slot], dtype=np.float32)
+
+    def put(self, key, vector):
+        """Store a vector, evicting the least recently used entry when full."""
+        with self.lock:
+            slot = self.slots.get(key)
+            if slot is None:
+                if self.free:
+                    slot = self.free.pop()
+                else:
+                    _, slot = self.slots.popitem(last=False)
+                self.slots[key] = slot
+            self.slots.move_to_end(key)
+            self.pending.append([key, slot])
+            self.vectors[slot] = vector
+            self.keys[slot] = _fingerprint(key)
+
+    def flush(self):
+        """Persist vectors and append the index changes since the last flush."""
+        with self.lock:
+            self.vectors.flush()
+            self.keys.flush()
+            self._append_pending()
+
+    def _append_pending(self):
+        """Append pending journal entries, compacting instead once the journal is long."""
+        if self.journal.lines + len(self.pending) > 4 * self.capacity:
+            self._compact()
+        elif self.pending:
+            self.journal.append(*self.pending)
+        self.pending = []
+
+    def _load(self):
+        """Replay the index journal into self.slots; returns its header, or None."""
+        records = self.journal.replay()
+        header = next(records, None)
+        owners = {}   # slot -> key, so a reused slot drops its previous key
+        for key, slot in records:
+            if owners.get(slot, key) != key:
+                self.slots.pop(owners[slot], None)
+            owners[slot] = key
+            self.slots.pop(key, None)
+            self.slots[key] = slot
+        return header
+
+    def _compact(self):
+        """Rewrite the journal as a header plus one line per live slot, in LRU order."""
+        header = {"dim": self.dim, "capacity": self.capacity, "dtype": self.dtype}
+        self.journal.compact([header, *([key, slot] for key, slot in self.slots.items())])
+
+    def encode(self, model_name, texts, encode_fn):
+        """
+        Embed texts, calling encode_fn(list_of_texts) only for cache misses.
+
+        Returns a list of float32 vectors in the same order as texts.
+        """
+        keys = [text_key(model_name, t) for t in texts]
+        vectors = [self.get(k) for k in keys]
+        missing = [i for i, v in enumerate(vectors) if v is None]
+
+        if missing:
+            # encode each distinct missing text once
+            unique = list(dict.fromkeys(texts[i] for i in missing))
+            fresh = dict(zip(unique, encode_fn(unique)))
+            for i in missing:
+                vectors[i] = np.asarray(fresh[texts[i]], dtype=np.float32)
+                self.put(keys[i], vectors[i])
+            self.flush()
+
+        return vectors
+
+
+class CachedEmbeddings(Embeddings):
+    """LangChain embeddings wrapper that serves repeated chunk texts from an EmbeddingCache."""
+
+    def __init__(self, embeddings, model_name, cache):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.cache = cache
+
+    def embed_documents(self, texts):
+        vectors = self.cache.encode(self.model_name, texts, self.embeddings.embed_documents)
+        return [v.tolist() for v in vectors]
+
+    def embed_query(self, text):
+        return self.embeddings.embed_query(text)
@@ -0,0 +1,94 @@
+import io
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+
+class QueuedFile(io.BytesIO):
+    """In-memory copy of an uploaded file, safe to use after the Streamlit run that received it."""
+
+    def __init__(self, name, data):
+        super().__init__(data)
+        self.name = name
+
+
+class IngestQueue:
+    """
+    Background worker pool for resume ingestion with per-file status.
+
+    ingest_fn(file, report) does the work for one QueuedFile and may call
+    report(stage_text) to publish progress; its return value is stored as
+    the job result.
+    """
+
+    def __init__(self, ingest_fn, workers=2):
+        self.ingest_fn = ingest_fn
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.lock = threading.Lock()
+        self.jobs = []
+
+    def submit(self, uploaded_file):
+        job = {
+            "file": uploaded_file.name,
+            "state": "queued",
+            "stage": "",
+            "result": None,
+            "error": None,
+            "submitted": time.time(),
+            "seconds": None
+        }
+        # copy the bytes now: the uploader's buffer is not ours to keep
+        queued = QueuedFile(uploaded_file.name, uploaded_file.getvalue())
+        with self.lock:
+            self.jobs.append(job)
+        self.pool.submit(self._run, job, queued)
+        return job
+
+    def _run(self, job, queued):
+        def report(stage):
+            job["stage"] = stage
+
+        started = time.perf_counter()
+        job["state"] = "running"
+        try:
+            job["result"] = self.ingest_fn(queued, report)
+            job["state"] = "done"
+        except Exception as e:
+            job["error"] = f"{type(e).__name__}: {e}"
+            job["state"] = "failed"
+        job["seconds"] = time.perf_counter() - started
+
+    def snapshot(self):
+        with self.lock:
+            return [dict(job) for job in self.jobs]
+
+    def clear_finished(self):
+        with self.lock:
+            self.jobs = [job for job in self.jobs if job["state"] in ("queued", "running")]
+
+
+@st.fragment(run_every=1)
+def show_ingest_progress(queue):
+    # reruns on its own every second, the rest of the page stays interactive
+    jobs = queue.snapshot()
+    active = any(job["state"] in ("queued", "running") for job in jobs)
+    if st.session_state.get("ingest_active") and not active:
+        # queue drained: rerun the whole page so lists and counts show the new resumes
+        st.session_state.ingest_active = False
+        st.rerun()
+    st.session_state.ingest_active = active
+    if not jobs:
+        return
+    finished = sum(job["state"] in ("done", "failed") for job in jobs)
+    st.progress(finished / len(jobs), text=f"{finished}/{len(jobs)} resumes processed")
+    icons = {"queued": "⏳", "running": "⚙️", "done": "✅", "failed": "❌"}
+    for job in jobs:
+        if job["state"] == "done":
+            detail = f"{job['result']} chunks in {job['seconds']:.1f}s"
+        elif job["state"] == "failed":
+            detail = job["error"]
+        else:
+            detail = job["stage"]
+        st.write(f"{icons[job['state']]} {job['file']} — {detail}")
@@ -0,0 +1,106 @@
+import os
+import json
+
+
+def write_atomic(path, write, mode="w"):
+    """Write a file through write(f) into a temporary file, then swap it into place."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, mode, encoding=None if "b" in mode else "utf-8") as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+class Journal:
+    """
+    Append-only JSON-lines log of changes, one record per line.
+
+    replay() yields the records in order and stops at a torn last line, left
+    by a crash before that change was acknowledged. compact() rewrites the
+    log as the given records so the next replay starts from a snapshot.
+    `lines` counts the records in the file, for deciding when to compact.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lines = 0
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def replay(self):
+        self.lines = 0
+        if not self.exists():
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # torn last line from an interrupted append
+                self.lines += 1
+                yield record
+
+    def append(self, *records):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(record) + "\n" for record in records)
+        self.lines += len(records)
+
+    def compact(self, records):
+        lines = [json.dumps(record) + "\n" for record in records]
+        write_atomic(self.path, lambda f: f.writelines(lines))
+        self.lines = len(lines)
+
+    def remove(self):
+        if self.exists():
+            os.remove(self.path)
+        self.lines = 0
+
+
+class RowIds:
+    """
+    Row bookkeeping for a file of rows that is only ever appended to.
+
+    Re-adding or removing an id tombstones its old row instead of rewriting
+    the file; live() lists the rows to keep when the owner compacts it, and
+    keep() renumbers the ids to match.
+    """
+
+    def __init__(self):
+        self.ids = []        # row -> id, None once tombstoned
+        self.rows = {}       # id -> row
+        self.dead = set()    # tombstoned rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, cid):
+        return cid in self.rows
+
+    def append(self, ids):
+        """Give each id the next row; returns the rows they replaced."""
+        replaced = self.remove(cid for cid in ids if cid in self.rows)
+        for cid in ids:
+            self.rows[cid] = len(self.ids)
+            self.ids.append(cid)
+        return replaced
+
+    def remove(self, ids):
+        """Tombstone the rows of the given ids; returns those rows."""
+        removed = []
+        for cid in ids:
+            row = self.rows.pop(cid, None)
+            if row is not None:
+                self.ids[row] = None
+                self.dead.add(row)
+                removed.append(row)
+        return removed
+
+    def live(self):
+        return [row for row, cid in enumerate(self.ids) if cid is not None]
+
+    def keep(self, live):
+        self.ids = [self.ids[row] for row in live]
+        self.rows = {cid: row for row, cid in enumerate(self.ids)}
+        self.dead = set()
@@ -0,0 +1,246 @@
+import os
+import threading
+
+import numpy as np
+
+from .journal import Journal, RowIds, write_atomic
+from .quantized_index import unit_vectors
+
+
+def _matches(metadata, where):
+    """Chroma-style filter: {"field": value} or {"field": {"$in": [...]}}, all fields must match."""
+    for field, condition in where.items():
+        value = metadata.get(field)
+        if isinstance(condition, dict):
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+            if "$eq" in condition and value != condition["$eq"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class NumpyVectorStore:
+    """
+    Exact cosine search over a memory-mapped float32 matrix of unit vectors.
+
+    Implements the part of the Chroma collection API the resume apps use
+    (upsert/add, get, query, delete, count), so it can stand in for
+    `collection`. One matrix-vector product plus argpartition per query,
+    no client round-trip; meant for up to a few hundred thousand chunks.
+
+    Rows are appended to <path>/vectors.f32 and ids, documents and metadata
+    to the <path>/records.jsonl sidecar. Deletes are tombstones in the
+    sidecar; dead rows are dropped when the store is next opened.
+    """
+
+    def __init__(self, path, dim=384):
+        os.makedirs(path, exist_ok=True)
+        self.vectors_path = os.path.join(path, "vectors.f32")
+        self.journal = Journal(os.path.join(path, "records.jsonl"))
+        self.dim = dim
+        self.lock = threading.Lock()
+        self.row_ids = RowIds()
+        self.documents = []
+        self.metadatas = []
+        self.matrix = np.empty((0, dim), dtype=np.float32)
+        self.stale = False   # rows appended since the matrix was mapped
+        self._load()
+
+    def count(self):
+        return len(self.row_ids)
+
+    def upsert(self, ids, embeddings, metadatas=None, documents=None):
+        """Append rows; an existing id is tombstoned and re-added. Same argument order as Chroma."""
+        ids = list(ids)
+        if not ids:
+            return
+        vectors = unit_vectors(embeddings)
+        documents = list(documents) if documents is not None else [None] * len(ids)
+        metadatas = list(metadatas) if metadatas is not None else [None] * len(ids)
+        with self.lock:
+            with open(self.vectors_path, "ab") as f:
+                vectors.tofile(f)
+            self.journal.append({"add": [list(r) for r in zip(ids, documents, metadatas)]})
+            self._append(ids, documents, metadatas)
+            self.stale = True
+
+    add = upsert
+
+    def delete(self, ids=None, where=None):
+        with self.lock:
+            targets = set(ids or [])
+            if where is not None:
+                targets.update(
+                    cid for cid, row in self.row_ids.rows.items()
+                    if _matches(self.metadatas[row] or {}, where)
+                )
+            targets = [cid for cid in targets if cid in self.row_ids]
+            if targets:
+                self.journal.append({"remove": targets})
+                self._remove(targets)
+
+    def get(self, ids=None, where=None, limit=None, offset=0, include=("documents", "metadatas")):
+        with self.lock:
+            matrix = self._mapped()
+            if ids is not None:
+                rows = [self.row_ids.rows[cid] for cid in ids if cid in self.row_ids]
+            else:
+                rows = self.row_ids.live()
+            if where is not None:
+                rows = [row for row in rows if _matches(self.metadatas[row] or {}, where)]
+            rows = rows[offset:offset + limit if limit is not None else None]
+            return self._fields(rows, matrix, include, {"ids": [self.row_ids.ids[row] for row in rows]})
+
+    def query(self, query_embeddings, n_results=10, include=("documents", "metadatas", "distances")):
+        """Exact top-n per query; distances are squared L2 between unit vectors, as Chroma reports."""
+        with self.lock:
+            matrix, dead, live = self._mapped(), list(self.row_ids.dead), len(self.row_ids)
+        results = {"ids": [], "distances": [], "documents": [], "metadatas": [], "embeddings": []}
+        n = min(n_results, live)
+        for query in unit_vectors(query_embeddings):
+            scores = matrix @ query
+            scores[dead] = -np.inf
+            top = np.argpartition(-scores, n - 1)[:n] if 0 < n < len(scores) else np.arange(n)
+            top = top[np.argsort(-scores[top])]
+            with self.lock:
+                found = self._fields(top, matrix, include, {"ids": [self.row_ids.ids[row] for row in top]})
+            found["distances"] = [float(2 - 2 * scores[row]) for row in top]
+            for field in results:
+                if field in found:
+                    results[field].append(found[field])
+        return {field: values for field, values in results.items() if field == "ids" or field in include}
+
+    def flush(self):
+        """Nothing is buffered, every write is appended before returning; kept for API parity."""
+
+    def _fields(self, rows, matrix, include, result):
+        if "documents" in include:
+            result["documents"] = [self.documents[row] for row in rows]
+        if "metadatas" in include:
+            result["metadatas"] = [self.metadatas[row] for row in rows]
+        if "embeddings" in include:
+            result["embeddings"] = np.asarray(matrix[list(rows)]) if len(rows) else np.empty((0, self.dim))
+        return result
+
+    def _mapped(self):
+        # appends go straight to the file, so remapping picks them up without a copy
+        if self.stale and self.row_ids.ids:
+            shape = (len(self.row_ids.ids), self.dim)
+            self.matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=shape)
+            self.stale = False
+        return self.matrix
+
+    def _append(self, ids, documents, metadatas):
+        for row in self.row_ids.append(ids):
+            self.documents[row] = self.metadatas[row] = None
+        self.documents.extend(documents)
+        self.metadatas.extend(metadatas)
+
+    def _remove(self, ids):
+        for row in self.row_ids.remove(ids):
+            self.documents[row] = self.metadatas[row] = None
+
+    def _load(self):
+        for record in self.journal.replay():
+            added = record.get("add", [])
+            if added:
+                self._append(*(list(column) for column in zip(*added)))
+            self._remove(record.get("remove", []))
+
+        rows = len(self.row_ids.ids)
+        stored = os.path.getsize(self.vectors_path) // (4 * self.dim) if os.path.exists(self.vectors_path) else 0
+        if stored < rows:
+            raise ValueError(f"{self.vectors_path} has {stored} rows, the journal lists {rows}")
+        if self.row_ids.dead or stored > rows:
+            self._compact()
+        self.stale = True
+
+    def _compact(self):
+        live = self.row_ids.live()
+
+        def write(f):
+            if not live:
+                return
+            old = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(len(self.row_ids.ids), self.dim))
+            for start in range(0, len(live), 65536):
+                np.asarray(old[live[start:start + 65536]]).tofile(f)
+        write_atomic(self.vectors_path, write, "wb")
+
+        self.row_ids.keep(live)
+        self.documents = [self.documents[row] for row in live]
+        self.metadatas = [self.metadatas[row] for row in live]
+        self.journal.compact([{"add": [list(r) for r in zip(self.row_ids.ids, self.documents, self.metadatas)]}])
+
+
+class EmbeddingStore:
+    """
+    The slice of LangChain's Chroma wrapper the apps call (add_texts,
+    add_documents, persist, embeddings, _collection), over a NumpyVectorStore.
+    """
+
+    def __init__(self, collection, embeddings):
+        self._collection = collection
+        self.embeddings = embeddings
+
+    def add_texts(self, texts, metadatas=None, ids=None):
+        import uuid
+        texts = list(texts)
+        ids = list(ids) if ids is not None else [str(uuid.uuid4()) for _ in texts]
+        self._collection.upsert(ids, self.embeddings.embed_documents(texts), metadatas=metadatas, documents=texts)
+        return ids
+
+    def add_documents(self, documents):
+        return self.add_texts([d.page_content for d in documents], [d.metadata for d in documents])
+
+    def persist(self):
+        self._collection.flush()
+
+
+if __name__ == "__main__":
+    import time
+    import shutil
+    import tempfile
+
+    rng = np.random.default_rng(0)
+    dim, k, n_queries = 384, 10, 200
+
+    for n in (10_000, 50_000, 200_000):
+        vectors = unit_vectors(rng.normal(size=(n, dim)))
+        queries = unit_vectors(vectors[rng.integers(0, n, n_queries)] + rng.normal(scale=0.05, size=(n_queries, dim)))
+        ids = [str(i) for i in range(n)]
+        truth = [set(np.argsort(-(vectors @ q))[:k].tolist()) for q in queries]
+
+        def measure(name, collection):
+            latencies, hits = [], 0
+            for q, expected in zip(queries, truth):
+                t = time.perf_counter()
+                found = collection.query(query_embeddings=[q.tolist()], n_results=k, include=["distances"])
+                latencies.append((time.perf_counter() - t) * 1000)
+                hits += len({int(i) for i in found["ids"][0]} & expected)
+            print(f"  {name:<6} p50={np.percentile(latencies, 50):.2f}ms p99={np.percentile(latencies, 99):.2f}ms "
+                  f"recall@{k}={hits / (k * n_queries):.3f}")
+
+        print(f"{n} chunks")
+        directory = tempfile.mkdtemp()
+        store = NumpyVectorStore(os.path.join(directory, "numpy"), dim)
+        started = time.perf_counter()
+        for start in range(0, n, 5000):
+            store.upsert(ids[start:start + 5000], vectors[start:start + 5000], metadatas=[{"row": 0}] * len(ids[start:start + 5000]))
+        print(f"  numpy  ingest {n / (time.perf_counter() - started):.0f} chunks/sec")
+        measure("numpy", store)
+
+        try:
+            import chromadb
+        except ImportError:
+            print("  chroma skipped: chromadb is not installed")
+        else:
+            client = chromadb.PersistentClient(path=os.path.join(directory, "chroma"))
+            collection = client.create_collection("bench", metadata={"hnsw:space": "cosine"})
+            started = time.perf_counter()
+            for start in range(0, n, 5000):
+                collection.add(ids=ids[start:start + 5000], embeddings=vectors[start:start + 5000].tolist())
+            print(f"  chroma ingest {n / (time.perf_counter() - started):.0f} chunks/sec")
+            measure("chroma", collection)
+        shutil.rmtree(directory, ignore_errors=True)
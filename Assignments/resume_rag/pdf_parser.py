@@ -0,0 +1,81 @@
+import os
+import time
+import multiprocessing
+from collections import deque
+
+POLL_INTERVAL = 0.05
+
+
+def iter_pdf_pages(stream, source):
+    """
+    Extract the pages of a PDF from an open binary file object, without a temp file.
+
+    Yields one Document per page, with source/page metadata, as each page
+    is extracted.
+    """
+    from pypdf import PdfReader
+    from langchain_core.documents import Document
+
+    stream.seek(0)
+
+    reader = PdfReader(stream)
+    for i, page in enumerate(reader.pages):
+        yield Document(page_content=page.extract_text() or "", metadata={"source": source, "page": i})
+
+
+def _load_pdf(path):
+    """Extract the pages of one PDF inside a worker process."""
+    with open(path, "rb") as f:
+        return list(iter_pdf_pages(f, path))
+
+
+def parse_pdfs(paths, workers=None, timeout=60, errors=None):
+    """
+    Parse PDFs in worker processes and yield (path, documents) as each file finishes.
+
+    A file that raises, crashes its worker or runs longer than `timeout`
+    seconds is skipped and recorded in `errors` as {"file", "error"}; the
+    pool is restarted after a timeout so a stuck parse cannot hold a worker.
+    """
+    workers = workers or os.cpu_count() or 1
+    errors = errors if errors is not None else []
+    pending = deque(paths)
+    running = {}  # path -> (async result, deadline)
+    # spawn: forking a threaded Streamlit server with torch loaded can deadlock the child
+    context = multiprocessing.get_context("spawn")
+    pool = context.Pool(workers)
+
+    try:
+        while pending or running:
+            while pending and len(running) < workers:
+                path = pending.popleft()
+                running[path] = (pool.apply_async(_load_pdf, (path,)), time.monotonic() + timeout)
+
+            finished = False
+            for path, (result, deadline) in list(running.items()):
+                if result.ready():
+                    del running[path]
+                    finished = True
+                    try:
+                        docs = result.get()
+                    except Exception as e:
+                        errors.append({"file": path, "error": f"{type(e).__name__}: {e}"})
+                        continue
+                    yield path, docs
+
+                elif time.monotonic() > deadline:
+                    del running[path]
+                    finished = True
+                    errors.append({"file": path, "error": f"Timed out after {timeout}s"})
+
+                    # kill the stuck worker; retry the other in-flight files on a fresh pool
+                    pool.terminate()
+                    pool = context.Pool(workers)
+                    pending.extendleft(reversed(list(running)))
+                    running.clear()
+                    break
+
+            if not finished:
+                time.sleep(POLL_INTERVAL)
+    finally:
+        pool.terminate()
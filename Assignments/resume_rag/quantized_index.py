@@ -0,0 +1,222 @@
+import os
+import threading
+
+import numpy as np
+
+from .journal import Journal, RowIds, write_atomic
+
+QUANTIZATIONS = ["int8", "binary"]
+
+# rows scored per block, so a search never materialises the whole matrix as float32
+SEARCH_BLOCK = 65536
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def unit_vectors(vectors):
+    """Rows scaled to unit length as float32; zero rows stay zero."""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+class QuantizedIndex:
+    """
+    Compact in-memory copy of the chunk embeddings for first-stage search.
+
+    "int8" keeps each unit vector as int8 codes plus one float32 scale
+    (dim + 4 bytes a row, about 4x smaller than float32); "binary" keeps
+    only the sign bits (dim / 8 bytes, 32x smaller) and ranks by Hamming
+    distance. Full-precision vectors stay on disk in a NumpyVectorStore and
+    only re-score the top candidates, see rescore().
+
+    Rows are appended to <path>.codes and ids to a <path>.ids.jsonl
+    journal, so adds never rewrite the file; removed rows are tombstoned
+    and dropped when the index is next loaded.
+    """
+
+    def __init__(self, path, dim=384, mode="int8"):
+        if mode not in QUANTIZATIONS:
+            raise ValueError(f"mode must be one of {QUANTIZATIONS}, got {mode!r}")
+        self.codes_path = path + ".codes"
+        self.journal = Journal(path + ".ids.jsonl")
+        self.dim = dim
+        self.mode = mode
+        if mode == "int8":
+            self.row_dtype = np.dtype([("code", np.int8, dim), ("scale", np.float32)])
+        else:
+            self.row_dtype = np.dtype([("code", np.uint8, dim // 8)])
+        self.lock = threading.Lock()
+        self.row_ids = RowIds()
+        self.blocks = []     # appended row arrays, concatenated lazily
+        self.matrix = np.empty(0, dtype=self.row_dtype)
+        self._load()
+
+    def __len__(self):
+        return len(self.row_ids)
+
+    def quantize(self, vectors):
+        vectors = unit_vectors(vectors)
+        packed = np.empty(len(vectors), dtype=self.row_dtype)
+        if self.mode == "int8":
+            scale = np.abs(vectors).max(axis=1) / 127
+            scale[scale == 0] = 1
+            packed["code"] = np.round(vectors / scale[:, None]).astype(np.int8)
+            packed["scale"] = scale
+        else:
+            packed["code"] = np.packbits(vectors > 0, axis=1)
+        return packed
+
+    def add(self, ids, vectors):
+        """Quantize and append vectors; re-adding an id replaces its old row."""
+        ids = list(ids)
+        if not ids:
+            return
+        packed = self.quantize(vectors)
+        with self.lock:
+            with open(self.codes_path, "ab") as f:
+                packed.tofile(f)
+            self.journal.append({"add": ids})
+            self.row_ids.append(ids)
+            self.blocks.append(packed)
+
+    def remove(self, ids):
+        with self.lock:
+            ids = [cid for cid in ids if cid in self.row_ids]
+            if ids:
+                self.journal.append({"remove": ids})
+                self.row_ids.remove(ids)
+
+    def clear(self):
+        with self.lock:
+            self.row_ids, self.blocks = RowIds(), []
+            self.matrix = np.empty(0, dtype=self.row_dtype)
+            self.journal.remove()
+            if os.path.exists(self.codes_path):
+                os.remove(self.codes_path)
+
+    def rebuild(self, collection, page_size=1000):
+        """Re-quantize every embedding already stored in a Chroma collection."""
+        self.clear()
+        offset = 0
+        while True:
+            page = collection.get(include=["embeddings"], limit=page_size, offset=offset)
+            if len(page["ids"]):
+                self.add(page["ids"], page["embeddings"])
+            if len(page["ids"]) < page_size:
+                break
+            offset += page_size
+
+    def search(self, query_vector, k=10):
+        """Top-k (chunk_id, approximate score) pairs in the compact space, best first."""
+        with self.lock:
+            if self.blocks:
+                self.matrix = np.concatenate([self.matrix] + self.blocks)
+                self.blocks = []
+            matrix, ids, dead = self.matrix, list(self.row_ids.ids), list(self.row_ids.dead)
+        if not len(matrix):
+            return []
+
+        query = unit_vectors(query_vector)[0]
+        if self.mode == "binary":
+            query_bits = np.packbits(query > 0)
+        scores = np.empty(len(matrix), dtype=np.float32)
+        for start in range(0, len(matrix), SEARCH_BLOCK):
+            block = matrix[start:start + SEARCH_BLOCK]
+            if self.mode == "int8":
+                scores[start:start + len(block)] = (block["code"].astype(np.float32) @ query) * block["scale"]
+            else:
+                hamming = _POPCOUNT[np.bitwise_xor(block["code"], query_bits)].sum(axis=1, dtype=np.int32)
+                scores[start:start + len(block)] = 1 - 2 * hamming / self.dim
+        scores[dead] = -np.inf
+
+        k = min(k, len(self.row_ids))
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+        top = top[np.argsort(-scores[top])]
+        return [(ids[row], float(scores[row])) for row in top if ids[row] is not None]
+
+    def memory_bytes(self):
+        return (len(self.matrix) + sum(len(b) for b in self.blocks)) * self.row_dtype.itemsize
+
+    def _load(self):
+        for record in self.journal.replay():
+            self.row_ids.append(record.get("add", []))
+            self.row_ids.remove(record.get("remove", []))
+        ids = self.row_ids.ids
+
+        stored = np.fromfile(self.codes_path, dtype=self.row_dtype) if os.path.exists(self.codes_path) else self.matrix
+        if len(stored) < len(ids):
+            raise ValueError(f"{self.codes_path} has {len(stored)} rows, the journal lists {len(ids)}")
+        # rows past the journal belong to an add that crashed before it was logged
+        matrix = stored[:len(ids)]
+
+        if self.row_ids.dead or len(matrix) < len(stored):
+            live = self.row_ids.live()
+            matrix = matrix[live]
+            self.row_ids.keep(live)
+            write_atomic(self.codes_path, matrix.tofile, "wb")
+            self.journal.compact([{"add": self.row_ids.ids}])
+        self.matrix = matrix
+
+
+def rescore(query_vector, ids, vectors, k):
+    """Exact cosine (chunk_id, score) pairs for the given candidates, best k first."""
+    if not len(ids):
+        return []
+    scores = unit_vectors(vectors) @ unit_vectors(query_vector)[0]
+    order = np.argsort(-scores)[:k]
+    return [(ids[i], float(scores[i])) for i in order]
+
+
+def query_collection(collection, index, query_vector, n_results, rescore_n=100, include=("documents",)):
+    """
+    Stand-in for collection.query() on one query: the top rescore_n
+    candidates from the compact index are re-scored with the collection's
+    full-precision vectors. Returns the same nested-list shape, with
+    squared L2 distances between unit vectors as Chroma reports them.
+    """
+    candidates = [cid for cid, _ in index.search(query_vector, rescore_n)]
+    if not candidates:
+        # empty index: Chroma rejects get(ids=[])
+        return {"ids": [[]], "distances": [[]], **{field: [[]] for field in include}}
+    found = collection.get(ids=candidates, include=list(set(include) | {"embeddings"}))
+    rows = {cid: i for i, cid in enumerate(found["ids"])}
+    hits = rescore(query_vector, found["ids"], found["embeddings"], n_results)
+
+    results = {"ids": [[cid for cid, _ in hits]], "distances": [[2 - 2 * score for _, score in hits]]}
+    for field in include:
+        results[field] = [[found[field][rows[cid]] for cid, _ in hits]]
+    return results
+
+
+if __name__ == "__main__":
+    import time
+    import tempfile
+
+    # clustered unit vectors, a rough stand-in for MiniLM chunk embeddings
+    rng = np.random.default_rng(0)
+    n, dim, k = 100_000, 384, 10
+    centers = rng.normal(size=(500, dim))
+    vectors = unit_vectors(centers[rng.integers(0, 500, n)] + rng.normal(scale=0.8, size=(n, dim)))
+    ids = [f"c{i}" for i in range(n)]
+    queries = unit_vectors(vectors[rng.integers(0, n, 200)] + rng.normal(scale=0.03, size=(200, dim)))
+    truth = [set(np.argsort(-(vectors @ q))[:k]) for q in queries]
+
+    print(f"float32: {vectors.nbytes / 1e6:.1f} MB")
+    for mode in QUANTIZATIONS:
+        index = QuantizedIndex(os.path.join(tempfile.mkdtemp(), "quantized"), dim, mode)
+        for start in range(0, n, 5000):
+            index.add(ids[start:start + 5000], vectors[start:start + 5000])
+        index.search(queries[0], k)  # concatenates the appended blocks
+        print(f"{mode}: {index.memory_bytes() / 1e6:.1f} MB "
+              f"({vectors.nbytes / index.memory_bytes():.0f}x smaller)")
+
+        for rescore_n in (k, 50, 200):
+            hits, started = 0, time.perf_counter()
+            for q, expected in zip(queries, truth):
+                candidates = [cid for cid, _ in index.search(q, rescore_n)]
+                rows = [int(cid[1:]) for cid in candidates]
+                found = rescore(q, candidates, vectors[rows], k)
+                hits += len({int(cid[1:]) for cid, _ in found} & expected)
+            ms = (time.perf_counter() - started) * 1000 / len(queries)
+            print(f"  re-score top {rescore_n:>3}: recall@{k}={hits / (k * len(queries)):.3f}  {ms:.1f} ms/query")
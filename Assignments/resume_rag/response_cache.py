@@ -0,0 +1,89 @@
+import re
+import time
+import threading
+
+import numpy as np
+
+from .quantized_index import unit_vectors
+
+
+def normalize_query(text):
+    """Lowercase and collapse whitespace, so re-pasted job descriptions embed alike."""
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+class SemanticCache:
+    """
+    Response cache keyed by the embedding of a normalised job description.
+
+    A lookup hits the most similar entry with the same params if its cosine
+    similarity is at least `threshold` and it is younger than `ttl` seconds.
+    Each entry remembers the resumes its answer used; invalidate(filenames)
+    drops every entry that touched one of them. clear() drops everything
+    when the corpus grows, since any cached answer may now miss a better
+    resume. Both bump `generation`, so a put() for an answer computed before
+    the change is discarded. Oldest entries are evicted beyond max_entries.
+    """
+
+    def __init__(self, threshold=0.95, ttl=3600, max_entries=256, clock=time.time):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.entries = []   # {"vector", "params", "value", "filenames", "created"}
+        self.generation = 0
+        self.metrics = {"hits": 0, "misses": 0, "invalidated": 0}
+
+    def get(self, vector, params=()):
+        """(value, similarity) of the best fresh match, or None."""
+        vector = unit_vectors(vector)[0]
+        with self.lock:
+            now = self.clock()
+            self.entries = [e for e in self.entries if now - e["created"] < self.ttl]
+            candidates = [e for e in self.entries if e["params"] == params]
+            if candidates:
+                similarities = np.stack([e["vector"] for e in candidates]) @ vector
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    self.metrics["hits"] += 1
+                    return candidates[best]["value"], float(similarities[best])
+            self.metrics["misses"] += 1
+            return None
+
+    def put(self, vector, value, filenames, params=(), generation=None):
+        """Store an answer; `generation` is self.generation read before computing it."""
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return  # the index changed while the answer was being computed
+            self.entries.append({
+                "vector": unit_vectors(vector)[0],
+                "params": params,
+                "value": value,
+                "filenames": set(filenames),
+                "created": self.clock()
+            })
+            del self.entries[:-self.max_entries]
+
+    def invalidate(self, filenames):
+        filenames = set(filenames)
+        with self.lock:
+            kept = [e for e in self.entries if not e["filenames"] & filenames]
+            self.metrics["invalidated"] += len(self.entries) - len(kept)
+            self.entries = kept
+            self.generation += 1
+
+    def clear(self):
+        with self.lock:
+            self.metrics["invalidated"] += len(self.entries)
+            self.entries = []
+            self.generation += 1
+
+    def stats(self):
+        with self.lock:
+            lookups = self.metrics["hits"] + self.metrics["misses"]
+            return dict(
+                self.metrics,
+                entries=len(self.entries),
+                hit_rate=self.metrics["hits"] / lookups if lookups else 0.0
+            )
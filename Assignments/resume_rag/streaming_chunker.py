@@ -0,0 +1,170 @@
+from bisect import bisect_left
+
+SEPARATORS = ("\n\n", "\n", ". ", " ")
+
+
+def _snap(text, floor, end, separators):
+    """
+    Latest break in (floor, end] at the most preferred separator, else end.
+    The cut goes after the separator's punctuation, so ". " leaves the
+    period with the sentence it ends.
+    """
+    for sep in separators:
+        k = text.rfind(sep, floor, end)
+        if k > floor:
+            return k + len(sep.rstrip())
+    return end
+
+
+def _trim(text, start, end):
+    """(start, end) with surrounding whitespace excluded, without slicing."""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def char_spans(text, chunk_size=1000, chunk_overlap=200, separators=SEPARATORS):
+    """
+    (start, end) offsets of chunks of at most chunk_size characters.
+
+    Each chunk ends at the most preferred separator in its second half and
+    the next one starts chunk_overlap characters earlier, moved forward to a
+    word start. Only offsets are computed: overlapping windows share the
+    page string instead of re-joining pieces.
+    """
+    if chunk_overlap >= chunk_size:
+        raise ValueError("chunk_overlap must be smaller than chunk_size")
+    pos, n = 0, len(text)
+    while pos < n:
+        end = min(pos + chunk_size, n)
+        if end < n:
+            end = _snap(text, pos + chunk_size // 2, end, separators)
+        start, stop = _trim(text, pos, end)
+        if start < stop:
+            yield start, stop
+        if end >= n:
+            break
+        if not chunk_overlap:
+            pos = end
+            continue
+        pos = max(end - chunk_overlap, pos + 1)
+        space = text.find(" ", pos, end)
+        if space != -1:
+            pos = space + 1
+
+
+def token_spans(text, offsets, chunk_size=256, chunk_overlap=32, separators=SEPARATORS):
+    """
+    Like char_spans, but sized in tokens. `offsets(text)` returns the
+    (start, end) character span of every token, e.g. from a Hugging Face
+    fast tokenizer, see hf_offsets(). The page is tokenized once.
+    """
+    if chunk_overlap >= chunk_size:
+        raise ValueError("chunk_overlap must be smaller than chunk_size")
+    spans = [span for span in offsets(text) if span[1] > span[0]]
+    starts = [s for s, _ in spans]
+    i, n = 0, len(spans)
+    while i < n:
+        j = min(i + chunk_size, n)
+        end = spans[j - 1][1]
+        if j < n:
+            end = _snap(text, spans[i + (j - i) // 2][0], end, separators)
+            j = max(bisect_left(starts, end), i + 1)
+        start, stop = _trim(text, spans[i][0], end)
+        if start < stop:
+            yield start, stop
+        if j >= n:
+            break
+        i = max(j - chunk_overlap, i + 1)
+
+
+def hf_offsets(tokenizer):
+    """Token offset function for token_spans() from a Hugging Face fast tokenizer."""
+    return lambda text: tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)["offset_mapping"]
+
+
+def split_text(texts, chunk_size=1000, chunk_overlap=200, offsets=None, separators=SEPARATORS):
+    """
+    Lazily chunk an iterable of page texts; yields chunk strings.
+
+    Sizes are characters, or tokens when an `offsets` function is given.
+    Chunks never cross page boundaries, and a page is only read when the
+    consumer reaches it.
+    """
+    for text in texts:
+        if offsets is None:
+            spans = char_spans(text, chunk_size, chunk_overlap, separators)
+        else:
+            spans = token_spans(text, offsets, chunk_size, chunk_overlap, separators)
+        for start, end in spans:
+            yield text[start:end]
+
+
+def split_documents(docs, chunk_size=1000, chunk_overlap=200, offsets=None, separators=SEPARATORS):
+    """Streaming stand-in for TextSplitter.split_documents(): yields one Document per chunk."""
+    from langchain_core.documents import Document
+
+    for doc in docs:
+        for chunk in split_text([doc.page_content], chunk_size, chunk_overlap, offsets, separators):
+            yield Document(page_content=chunk, metadata=dict(doc.metadata))
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    import time
+    import random
+    import tracemalloc
+    from langchain_core.documents import Document
+
+    # PDFs from the folder given on the command line, otherwise synthetic resume pages
+    if len(sys.argv) > 1:
+        from resume_rag.pdf_parser import parse_pdfs
+        paths = [os.path.join(sys.argv[1], f) for f in os.listdir(sys.argv[1]) if f.lower().endswith(".pdf")]
+        pages = [doc for _, docs in parse_pdfs(paths) for doc in docs]
+    else:
+        random.seed(0)
+        words = ["python", "django", "kubernetes", "led", "team", "built", "api", "data", "pipeline",
+                 "managed", "stakeholders", "delivered", "react", "sql", "aws", "projects", "and", "the"]
+        pages = [
+            Document(
+                page_content="\n\n".join(
+                    "\n".join(" ".join(random.choices(words, k=12)) + "." for _ in range(random.randint(2, 6)))
+                    for _ in range(random.randint(4, 10))
+                ),
+                metadata={"source": f"resume_{i // 2}.pdf", "page": i % 2}
+            )
+            for i in range(20_000)
+        ]
+    total_chars = sum(len(p.page_content) for p in pages)
+    print(f"{len(pages)} pages, {total_chars / 1e6:.1f}M characters")
+
+    def measure(name, split):
+        tracemalloc.start()
+        started = time.perf_counter()
+        count = sum(1 for _ in split())
+        seconds = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"  {name:<36} {count:>7} chunks  {total_chars / seconds / 1e6:6.1f}M chars/s  peak {peak / 1e6:6.1f} MB")
+
+    measure("streaming (chars 1000/200)", lambda: split_documents(pages, 1000, 200))
+    try:
+        from langchain_text_splitters import RecursiveCharacterTextSplitter, CharacterTextSplitter
+    except ImportError:
+        print("  LangChain splitters skipped: langchain_text_splitters is not installed")
+    else:
+        measure("RecursiveCharacterTextSplitter", lambda: RecursiveCharacterTextSplitter(
+            chunk_size=1000, chunk_overlap=200).split_documents(pages))
+        measure("CharacterTextSplitter", lambda: CharacterTextSplitter(
+            chunk_size=1000, chunk_overlap=200).split_documents(pages))
+
+    try:
+        from transformers import AutoTokenizer
+    except ImportError:
+        print("  token sizing skipped: transformers is not installed")
+    else:
+        tokenizer = AutoTokenizer.from_pretrained("sentence-transformers/all-MiniLM-L6-v2")
+        measure("streaming (MiniLM tokens 256/32)", lambda: split_documents(pages, 256, 32, hf_offsets(tokenizer)))
@@ -0,0 +1,32 @@
+from resume_rag.journal import Journal, RowIds
+
+
+def test_replay_stops_at_torn_line(tmp_path):
+    journal = Journal(str(tmp_path / "log.jsonl"))
+    journal.append({"add": ["a"]}, {"add": ["b"]})
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"add": ["c"')
+
+    assert list(journal.replay()) == [{"add": ["a"]}, {"add": ["b"]}]
+    assert journal.lines == 2
+
+
+def test_compact_replaces_the_log(tmp_path):
+    journal = Journal(str(tmp_path / "log.jsonl"))
+    journal.append({"add": ["a"]}, {"remove": ["a"]}, {"add": ["b"]})
+    journal.compact([{"add": ["b"]}])
+
+    assert list(journal.replay()) == [{"add": ["b"]}]
+
+
+def test_readding_an_id_tombstones_its_old_row():
+    row_ids = RowIds()
+    row_ids.append(["a", "b"])
+
+    assert row_ids.append(["a"]) == [0]
+    assert row_ids.remove(["b", "missing"]) == [1]
+    assert len(row_ids) == 1
+    assert row_ids.live() == [2]
+
+    row_ids.keep(row_ids.live())
+    assert row_ids.ids == ["a"] and row_ids.rows == {"a": 0} and not row_ids.dead
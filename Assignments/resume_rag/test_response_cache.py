@@ -0,0 +1,20 @@
+from resume_rag.response_cache import SemanticCache
+
+
+def test_put_computed_before_a_change_is_dropped():
+    for change in (lambda cache: cache.clear(), lambda cache: cache.invalidate(["a.pdf"])):
+        cache = SemanticCache()
+        generation = cache.generation
+        change(cache)
+        cache.put([1.0, 0.0], "stale answer", ["a.pdf"], generation=generation)
+        assert cache.get([1.0, 0.0]) is None
+
+
+def test_invalidate_drops_entries_that_used_the_resume():
+    cache = SemanticCache()
+    cache.put([1.0, 0.0], "uses a", ["a.pdf"])
+    cache.put([0.0, 1.0], "uses b", ["b.pdf"])
+    cache.invalidate(["a.pdf"])
+
+    assert cache.get([1.0, 0.0]) is None
+    assert cache.get([0.0, 1.0]) == ("uses b", 1.0)
@@ -0,0 +1,28 @@
+import re
+
+from resume_rag.streaming_chunker import split_text
+
+TEXT = "First sentence here. Second sentence here. Third sentence is here."
+
+
+def word_offsets(text):
+    return [m.span() for m in re.finditer(r"\S+", text)]
+
+
+def test_sentence_keeps_its_period():
+    assert list(split_text([TEXT], chunk_size=30, chunk_overlap=0)) == [
+        "First sentence here.",
+        "Second sentence here.",
+        "Third sentence is here."
+    ]
+
+
+def test_token_chunks_end_at_sentence_boundaries():
+    chunks = list(split_text([TEXT], chunk_size=5, chunk_overlap=0, offsets=word_offsets))
+    assert chunks[0] == "First sentence here."
+    assert all(chunk.endswith(".") for chunk in chunks)
+
+
+def test_paragraph_break_preferred_over_sentence():
+    text = "Skills: python, sql. Tools: git.\n\nExperience: five years."
+    assert list(split_text([text], chunk_size=50, chunk_overlap=0))[0] == "Skills: python, sql. Tools: git."